@@ -0,0 +1,2137 @@
+"""
+四象限任务清单的核心逻辑，不依赖 Qt：任务数据、持久化（快照 + 日志 / SQLite）、归档、导入导出和搜索。
+桌面挂件 v7.py 是建立在它之上的界面；脚本、定时任务或没有图形界面的服务器可以直接使用 Board，
+或者通过命令行操作同一份数据：
+
+    python -m task_core add "写周报" "整理发票" --quadrant 紧急重要
+    python -m task_core export 已完成事项.csv --done
+    python -m task_core export 报告.csv --query "quadrant:紧急重要 created>=2026-01 text:报告"
+    python -m task_core archive --days 30
+"""
+import sys
+import os
+import json
+import hashlib
+import itertools
+import re
+import mmap
+import struct
+import threading
+import unicodedata
+import uuid
+import functools
+from bisect import bisect_left, bisect_right
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Collection, Optional
+
+# 四个象限（与挂件界面一致），新任务默认放入“紧急重要”
+QUADRANT_NAMES = ("不紧急重要", "紧急重要", "不紧急不重要", "紧急不重要")
+DEFAULT_QUADRANT = "紧急重要"
+
+
+# --- 1. 任务项逻辑 ---
+@functools.lru_cache(maxsize=1024)
+def format_task_tooltip(content: str, is_done: bool, created_at: str, finished_at: str) -> str:
+    """
+    悬停提示：显示任务状态和时间信息。
+    以任务字段为键缓存，任务内容或状态一变键就不同，不需要手动失效
+    """
+    status_text = "已完成" if is_done else "未完成"
+    tooltip = f"内容：{content}\n状态：{status_text}\n创建时间：{created_at}"
+    if is_done and finished_at:
+        tooltip += f"\n完成时间：{finished_at}"
+    return tooltip
+
+
+class TaskItem:
+    """
+    单个任务的数据记录。
+    只保存数据本身（使用 __slots__，不带字体/颜色/提示等界面对象），
+    显示样式由 TaskDelegate 在绘制时计算，提示文本在悬停时才生成。
+    """
+
+    __slots__ = ("id", "content", "created_at", "finished_at", "is_done")
+
+    def __init__(
+        self,
+        text: str,
+        created_at: Optional[str] = None,
+        finished_at: str = "未完成",
+        is_done: bool = False,
+        task_id: Optional[str] = None,
+    ):
+        # 持久化的唯一 ID，新任务自动生成
+        self.id = task_id or uuid.uuid4().hex
+        self.content = text
+        # 如果是从历史记录恢复，则使用传入时间；否则使用当前时间
+        self.created_at = created_at or datetime.now().strftime("%Y-%m-%d %H:%M")
+        self.finished_at = finished_at
+        self.is_done = is_done
+
+    def toggle_status(self):
+        self.is_done = not self.is_done
+        self.finished_at = datetime.now().strftime("%Y-%m-%d %H:%M") if self.is_done else "未完成"
+
+    def tooltip(self) -> str:
+        """悬停提示：只在 Qt 请求 ToolTipRole 时生成，按任务当前内容缓存"""
+        return format_task_tooltip(self.content, self.is_done, self.created_at, self.finished_at)
+
+    def to_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "content": self.content,
+            "created_at": self.created_at,
+            "finished_at": self.finished_at,
+            "is_done": self.is_done,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "TaskItem":
+        return cls(
+            data.get("content", ""),
+            created_at=data.get("created_at"),
+            finished_at=data.get("finished_at", "未完成"),
+            is_done=data.get("is_done", False),
+            task_id=data.get("id"),
+        )
+
+
+def reorder_moves(old: list, new: list) -> list:
+    """求把 old 排成 new 所需的一串列表内移动 (row, to_row, 被移动的任务)，用于写入日志"""
+    current = list(old)
+    moves = []
+    for i, task in enumerate(new):
+        if current[i] is not task:
+            j = next(k for k in range(i + 1, len(current)) if current[k] is task)
+            current.insert(i, current.pop(j))
+            moves.append((j, i, task))
+    return moves
+
+
+# --- 2. 持久化：快照 + 追加日志 ---
+def locate_record_task(tasks: dict, record: dict) -> Optional[tuple]:
+    """
+    返回 update / move / delete 记录所指任务当前的 (象限, 行)，tasks 为按象限分组的任务字典。
+    记录带任务 ID 时以 ID 为准：行号处不是该任务（其他进程的改动交错写入）时按 ID 查找，
+    任务已不存在时返回 None；旧日志中没有 ID 的记录仍按行号处理
+    """
+    q, row = record["q"], record["row"]
+    task_id = record.get("id")
+    if task_id is None:
+        return q, row
+    items = tasks.get(q) or []
+    if 0 <= row < len(items) and items[row].get("id") == task_id:
+        return q, row
+    for name, items in tasks.items():
+        for i, item in enumerate(items):
+            if item.get("id") == task_id:
+                return name, i
+    return None
+
+
+def apply_journal_record(data: dict, record: dict):
+    """把一条改动记录重放到状态字典上（data["tasks"] 为按象限分组的列表）"""
+    op = record.get("op")
+    tasks = data["tasks"]
+    if op == "meta":
+        data.update(record.get("fields") or {})
+    elif op == "add":
+        tasks.setdefault(record["q"], []).insert(record["row"], dict(record["task"]))
+    elif op == "add_many":
+        row = record["row"]
+        tasks.setdefault(record["q"], [])[row:row] = [dict(t) for t in record["tasks"]]
+    elif op in ("update", "move", "delete"):
+        located = locate_record_task(tasks, record)
+        if located is None:
+            # 任务已被其他改动删除
+            return
+        q, row = located
+        if op == "update":
+            tasks[q][row].update(record.get("fields") or {})
+        elif op == "move":
+            task = tasks[q].pop(row)
+            tasks.setdefault(record["to_q"], []).insert(record["to_row"], task)
+        else:
+            tasks[q].pop(row)
+    elif op == "batch":
+        # 一次事务中的多条改动，按顺序重放
+        for sub in record["records"]:
+            apply_journal_record(data, sub)
+
+
+def rebase_records(data: dict, records: list) -> dict:
+    """
+    把本进程尚未写出的改动记录按任务 ID 重放到另一份完整状态上，返回重放后的状态
+    （data["tasks"] 为带 quadrant 字段的任务列表）。用于其他进程整体重写了快照、
+    本地还有待写记录的情况：本地删除 / 修改过的任务以 ID 对应，已不存在的跳过
+    """
+    grouped = {}
+    for t in data.get("tasks") or []:
+        grouped.setdefault(t.get("quadrant", DEFAULT_QUADRANT), []).append(t)
+    rebased = dict(data, tasks=grouped)
+    for record in records:
+        apply_journal_record(rebased, record)
+    tasks = []
+    for q, items in grouped.items():
+        for t in items:
+            t["quadrant"] = q
+        tasks.extend(items)
+    rebased["tasks"] = tasks
+    return rebased
+
+
+def invert_record(record: dict) -> dict:
+    """
+    求改动记录的逆记录，用于撤销。
+    update 需带 old（修改前的字段），delete 需带 task（被删除的任务）
+    """
+    op = record["op"]
+    if op == "add":
+        return {
+            "op": "delete", "q": record["q"], "row": record["row"],
+            "id": record["task"].get("id"), "task": record["task"],
+        }
+    if op == "add_many":
+        row = record["row"]
+        return {"op": "batch", "records": [
+            {"op": "delete", "q": record["q"], "row": row + i, "id": task.get("id"), "task": task}
+            for i, task in reversed(list(enumerate(record["tasks"])))
+        ]}
+    if op == "update":
+        return {
+            "op": "update", "q": record["q"], "row": record["row"], "id": record.get("id"),
+            "fields": record["old"], "old": record["fields"],
+        }
+    if op == "move":
+        return {
+            "op": "move", "q": record["to_q"], "row": record["to_row"], "id": record.get("id"),
+            "to_q": record["q"], "to_row": record["row"],
+        }
+    if op == "delete":
+        return {"op": "add", "q": record["q"], "row": record["row"], "task": record["task"]}
+    if op == "batch":
+        return {"op": "batch", "records": [invert_record(r) for r in reversed(record["records"])]}
+    raise ValueError(f"无法撤销的改动: {op}")
+
+
+class UndoHistory:
+    """
+    撤销 / 重做栈。直接保存改动记录（与日志同一格式），不保存整个看板：
+    撤销时应用 invert_record() 的结果，重做时重新应用原记录。
+    最多保留 limit 步，超出时丢弃最早的记录
+    """
+
+    def __init__(self, limit: int = 100):
+        self._undo = deque(maxlen=limit)
+        self._redo = deque(maxlen=limit)
+
+    @property
+    def limit(self) -> int:
+        return self._undo.maxlen
+
+    def set_limit(self, limit: int):
+        self._undo = deque(self._undo, maxlen=limit)
+        self._redo = deque(self._redo, maxlen=limit)
+
+    def push(self, record: dict):
+        self._undo.append(record)
+        self._redo.clear()
+
+    def undo(self) -> Optional[dict]:
+        """取出最近一步（移入重做栈），没有时返回 None"""
+        if not self._undo:
+            return None
+        record = self._undo.pop()
+        self._redo.append(record)
+        return record
+
+    def redo(self) -> Optional[dict]:
+        if not self._redo:
+            return None
+        record = self._redo.pop()
+        self._undo.append(record)
+        return record
+
+    def clear(self):
+        self._undo.clear()
+        self._redo.clear()
+
+
+if os.name == "nt":
+    import msvcrt
+
+    def _lock_file(f, blocking: bool = True):
+        f.seek(0)
+        # LK_LOCK 最多等待约 10 秒，超时抛出 OSError；LK_NBLCK 被占用时立即抛出
+        msvcrt.locking(f.fileno(), msvcrt.LK_LOCK if blocking else msvcrt.LK_NBLCK, 1)
+
+    def _unlock_file(f):
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+else:
+    import fcntl
+
+    def _lock_file(f, blocking: bool = True):
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB)
+
+    def _unlock_file(f):
+        fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+class FileLock:
+    """
+    跨进程的建议锁：对锁文件加排他锁（fcntl.flock / msvcrt.locking），同一进程内可重入。
+    只约束同样使用此锁的进程（挂件、命令行）；path 为 None 时只作为线程锁使用。
+    """
+
+    def __init__(self, path: Optional[str]):
+        self.path = path
+        self._thread_lock = threading.RLock()
+        self._depth = 0
+        self._file = None
+
+    def acquire(self, blocking: bool = True) -> bool:
+        """加锁并返回 True；blocking 为 False 时，锁被其他线程或进程占用则立即返回 False"""
+        if not self._thread_lock.acquire(blocking):
+            return False
+        if self._depth == 0 and self.path is not None:
+            try:
+                f = open(self.path, "a+b")
+                try:
+                    _lock_file(f, blocking)
+                except OSError:
+                    f.close()
+                    raise
+            except OSError:
+                self._thread_lock.release()
+                if blocking:
+                    raise
+                return False
+            self._file = f
+        self._depth += 1
+        return True
+
+    def release(self):
+        self._depth -= 1
+        if self._depth == 0 and self._file is not None:
+            try:
+                _unlock_file(self._file)
+            finally:
+                self._file.close()
+                self._file = None
+        self._thread_lock.release()
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+
+
+class StorageConflict(RuntimeError):
+    """其他进程写入的改动尚未合并，此时写入会覆盖或打乱它们；合并后重试即可"""
+
+
+class StateStorage:
+    """
+    持久化后端接口。界面状态以两种方式写入：
+    - append_many(records)：逐条改动记录（见 apply_journal_record），用于日常操作；
+    - compact(data)：完整状态快照，用于压缩、设置修改和退出。
+    load() 返回完整状态字典（tasks 为带 quadrant 字段的任务列表），没有数据时返回 None。
+    多个进程共用同一份数据时，写入在 lock 内进行，read_changes() 取回其他进程的改动。
+    """
+
+    # 提交多少条改动记录后需要写一次完整快照；None 表示不需要
+    compact_threshold = None
+
+    def __init__(self):
+        self.pending = 0  # 自上次快照以来已写入的改动记录数
+        self.needs_compact = False  # 存储中的任务与内存不一致（发生过恢复），需要完整重写
+        self.lock = FileLock(None)
+
+    def load(self) -> Optional[dict]:
+        raise NotImplementedError
+
+    def append_many(self, records: list):
+        raise NotImplementedError
+
+    def compact(self, data: dict):
+        raise NotImplementedError
+
+    def watch_paths(self) -> list:
+        """其他进程写入时会变化的文件，供界面监视"""
+        return []
+
+    def read_changes(self) -> tuple:
+        """
+        读取其他进程写入、尚未合并的改动，返回 (改动记录列表, None)；
+        无法逐条合并时（例如快照被整体重写）返回 (None, 完整状态)
+        """
+        return [], None
+
+    def close(self):
+        pass
+
+
+class JsonStorage(StateStorage):
+    """
+    JSON 后端：快照文件 + 追加式日志。
+    每次改动只向 .journal 追加一行 JSON 记录（O(1) 写入），
+    记录数达到阈值时再把完整状态压缩进快照文件并清空日志。
+    快照通过 临时文件 + fsync + 重命名 原子写入，带校验和，
+    并保留 backup_count 代历史快照（.1 最新），读取时自动回退到最新的有效版本。
+    """
+
+    def __init__(
+        self,
+        snapshot_path: str,
+        compact_threshold: int = 500,
+        backup_count: int = 3,
+        use_cache: bool = True,
+    ):
+        super().__init__()
+        self.snapshot_path = snapshot_path
+        self.journal_path = os.path.splitext(snapshot_path)[0] + ".journal"
+        self.compact_threshold = compact_threshold
+        self.backup_count = backup_count
+        self.seq = 0  # 最近一条记录的序号
+        # 快照的二进制缓存：快照未变时启动直接读取缓存，不解析 JSON
+        self.cache = SnapshotCache(os.path.splitext(snapshot_path)[0] + ".cache") if use_cache else None
+        # 读写都在锁内进行，并记住已读到的位置，以便发现其他进程的写入
+        self.lock = FileLock(os.path.splitext(snapshot_path)[0] + ".lock")
+        self._tracking = False  # 读取或写入过快照后才有比较的基准
+        self._snapshot_stamp = None  # 快照文件的 (mtime, 大小)
+        self._journal_offset = 0  # 日志中已读取 / 写入到的字节位置
+        self._external = []  # 其他进程写入、尚未取走的改动记录
+        self._external_snapshot = False  # 其他进程重写了快照
+
+    def backup_path(self, generation: int) -> str:
+        return f"{self.snapshot_path}.{generation}"
+
+    def _stat_snapshot(self) -> Optional[tuple]:
+        try:
+            stat = os.stat(self.snapshot_path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def _start_tracking(self):
+        """以磁盘上的当前内容为基准（在锁内调用）"""
+        self._tracking = True
+        self._snapshot_stamp = self._stat_snapshot()
+        self._journal_offset = os.path.getsize(self.journal_path) if os.path.exists(self.journal_path) else 0
+        self._external = []
+        self._external_snapshot = False
+
+    def _scan_external(self):
+        """读取其他进程追加到日志末尾的记录（在锁内调用）"""
+        if not self._tracking or self._external_snapshot:
+            return
+        size = os.path.getsize(self.journal_path) if os.path.exists(self.journal_path) else 0
+        if self._stat_snapshot() != self._snapshot_stamp or size < self._journal_offset:
+            # 快照被重写、日志被截断：无法逐条合并
+            self._external_snapshot = True
+            return
+        if size == self._journal_offset:
+            return
+        with open(self.journal_path, "rb") as f:
+            f.seek(self._journal_offset)
+            chunk = f.read(size - self._journal_offset)
+        for line in chunk.splitlines(keepends=True):
+            if not line.endswith(b"\n"):
+                break  # 不完整的行留到下次
+            self._journal_offset += len(line)
+            try:
+                record = json.loads(line)
+                seq = int(record.get("seq", 0))
+            except (ValueError, AttributeError):
+                continue
+            if seq > self.seq:
+                self.seq = seq
+                self._external.append(record)
+
+    def watch_paths(self) -> list:
+        return [self.snapshot_path, self.journal_path]
+
+    def read_changes(self) -> tuple:
+        with self.lock:
+            self._scan_external()
+            if self._external_snapshot:
+                return None, self.load()
+            records, self._external = self._external, []
+            return records, None
+
+    def append_many(self, records: list):
+        """一次性追加多条改动记录（一次打开、一次写入、一次 fsync）"""
+        with self.lock:
+            self._scan_external()
+            if self._external_snapshot:
+                # 记录的行号基于旧快照，追加到新日志后会错位
+                raise StorageConflict("快照已被其他进程重写")
+            if self._external:
+                # 本进程的记录排在其他进程的记录之后，与内存中的顺序不同，合并后需要重写快照
+                self.needs_compact = True
+            lines = []
+            for record in records:
+                self.seq += 1
+                record = dict(record, seq=self.seq)
+                lines.append(json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n")
+            raw = "".join(lines).encode("utf-8")
+            with open(self.journal_path, "ab") as f:
+                f.write(raw)
+                f.flush()
+                os.fsync(f.fileno())
+            self._journal_offset += len(raw)
+            self.pending += len(records)
+
+    def compact(self, data: dict):
+        """把完整状态原子地写入快照，轮转备份，并清空日志"""
+        with self.lock:
+            self._scan_external()
+            if self._external or self._external_snapshot:
+                # 快照中没有其他进程的改动，写入会把它们覆盖掉
+                raise StorageConflict("有其他进程的改动尚未合并")
+            self._compact(data)
+            self._start_tracking()
+
+    def _compact(self, data: dict):
+        data = dict(data, journal_seq=self.seq)
+        data.pop("checksum", None)
+        data["checksum"] = snapshot_checksum(data)
+        raw = json.dumps(data, ensure_ascii=False, indent=2).encode("utf-8")
+
+        tmp_path = self.snapshot_path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(raw)
+            f.flush()
+            os.fsync(f.fileno())
+
+        # 轮转备份：.1 -> .2 -> ... ，当前快照变为 .1
+        if self.backup_count > 0 and os.path.exists(self.snapshot_path):
+            for gen in range(self.backup_count - 1, 0, -1):
+                if os.path.exists(self.backup_path(gen)):
+                    os.replace(self.backup_path(gen), self.backup_path(gen + 1))
+            os.replace(self.snapshot_path, self.backup_path(1))
+        os.replace(tmp_path, self.snapshot_path)
+        fsync_dir(self.snapshot_path)
+        if self.cache is not None:
+            self.cache.write(data, self.snapshot_path, raw)
+
+        # 快照已包含全部改动（journal_seq 之前的记录），日志可以截断
+        with open(self.journal_path, "w", encoding="utf-8"):
+            pass
+        self.pending = 0
+        self.needs_compact = False
+
+    def read_snapshot(self) -> Optional[dict]:
+        """按 当前快照 -> .1 -> .2 ... 的顺序读取第一个校验通过的快照（当前快照的缓存有效时直接使用缓存）"""
+        if self.cache is not None:
+            data = self.cache.read(self.snapshot_path)
+            if data is not None:
+                return data
+        candidates = [self.snapshot_path] + [
+            self.backup_path(gen) for gen in range(1, self.backup_count + 1)
+        ]
+        for path in candidates:
+            if not os.path.exists(path):
+                continue
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                if not isinstance(data, dict):
+                    raise ValueError("snapshot is not an object")
+                checksum = data.pop("checksum", None)
+                # 旧版本文件没有校验和，只要能解析就接受
+                if checksum is not None and checksum != snapshot_checksum(data):
+                    raise ValueError("checksum mismatch")
+            except (OSError, ValueError):
+                if path == self.snapshot_path:
+                    # 损坏的快照移到一边保留，避免被轮转进备份里
+                    try:
+                        os.replace(path, path + ".corrupt")
+                    except OSError:
+                        pass
+                self.needs_compact = True
+                continue
+            return data
+        return None
+
+    def load(self) -> Optional[dict]:
+        """读取快照并按顺序重放日志，返回完整状态；两者都不存在时返回 None"""
+        with self.lock:
+            data = self._load()
+            self._start_tracking()
+            return data
+
+    def _load(self) -> Optional[dict]:
+        self.needs_compact = False
+        data = self.read_snapshot()
+        if data is None and not os.path.exists(self.journal_path):
+            return None
+        data = data or {}
+        self.seq = int(data.get("journal_seq", 0))
+
+        # 按象限分组，便于按 (象限, 行号) 重放
+        grouped = {}
+        for t in data.get("tasks") or []:
+            grouped.setdefault(t.get("quadrant", DEFAULT_QUADRANT), []).append(t)
+        data["tasks"] = grouped
+
+        self.pending = 0
+        if os.path.exists(self.journal_path):
+            max_seq = self.seq
+            replaying = True
+            with open(self.journal_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                        seq = int(record.get("seq", 0))
+                    except (ValueError, AttributeError):
+                        # 最后一行可能因崩溃而不完整，忽略之后的内容
+                        self.needs_compact = True
+                        break
+                    max_seq = max(max_seq, seq)
+                    if seq <= self.seq or not replaying:
+                        # 快照写入后、日志截断前崩溃：这些记录已包含在快照中
+                        continue
+                    if seq != self.seq + 1:
+                        # 序号不连续（例如回退到了旧备份），之后的记录无法安全重放
+                        replaying = False
+                        self.needs_compact = True
+                        continue
+                    try:
+                        apply_journal_record(data, record)
+                    except (KeyError, IndexError, TypeError):
+                        replaying = False
+                        self.needs_compact = True
+                        continue
+                    self.seq = seq
+                    self.pending += 1
+            # 新记录的序号必须大于日志中已有的任何序号
+            self.seq = max_seq
+
+        tasks = []
+        for q, items in grouped.items():
+            for t in items:
+                t["quadrant"] = q
+            tasks.extend(items)
+        data["tasks"] = tasks
+        return data
+
+
+def snapshot_checksum(data: dict) -> str:
+    """快照内容的校验和（对规范化后的 JSON 计算 SHA-256）"""
+    canonical = json.dumps(data, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+    return "sha256:" + hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class SnapshotCache:
+    """
+    JSON 快照的二进制列式缓存，JSON 仍是唯一可靠的数据来源，缓存随时可以删除。
+    文件格式：MAGIC | 头部长度(u32) | 头部 JSON | 各列（长度(u64) + 内容）。
+    头部记录版本号、设置项，以及对应 JSON 文件的 mtime、大小和 SHA-256；
+    列依次为 象限序号(u8)、是否完成(u8)、以及以 \0 分隔的 id / 内容 / 创建时间 / 完成时间。
+    读取时用 mmap 映射文件，与 JSON 不一致或格式不对时返回 None，由调用方回退到解析 JSON。
+    """
+
+    MAGIC = b"EQTCACHE"
+    VERSION = 1
+    STRING_COLUMNS = ("id", "content", "created_at", "finished_at")
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def discard(self):
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+    def write(self, data: dict, json_path: str, raw: bytes):
+        """为刚写入的快照（raw 为 JSON 文件的完整内容）生成缓存；写入失败只是没有缓存"""
+        tasks = data.get("tasks") or []
+        quadrants = list(dict.fromkeys(t.get("quadrant", DEFAULT_QUADRANT) for t in tasks))
+        columns = [[t.get(name) for t in tasks] for name in self.STRING_COLUMNS]
+        # 字符串列用 \0 分隔，含 \0 或不是字符串的值无法缓存
+        if len(quadrants) > 255 or not all(
+            isinstance(v, str) and "\0" not in v for column in columns for v in column
+        ):
+            self.discard()
+            return
+        index = {q: i for i, q in enumerate(quadrants)}
+        sections = [
+            bytes(index[t.get("quadrant", DEFAULT_QUADRANT)] for t in tasks),
+            bytes(1 if t.get("is_done") else 0 for t in tasks),
+        ]
+        sections.extend("\0".join(column).encode("utf-8") for column in columns)
+        try:
+            stat = os.stat(json_path)
+            header = json.dumps({
+                "version": self.VERSION,
+                "json_mtime_ns": stat.st_mtime_ns,
+                "json_size": stat.st_size,
+                "json_sha256": hashlib.sha256(raw).hexdigest(),
+                "count": len(tasks),
+                "quadrants": quadrants,
+                "meta": {k: v for k, v in data.items() if k not in ("tasks", "checksum")},
+            }, ensure_ascii=False).encode("utf-8")
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(self.MAGIC)
+                f.write(struct.pack("<I", len(header)))
+                f.write(header)
+                for section in sections:
+                    f.write(struct.pack("<Q", len(section)))
+                    f.write(section)
+            os.replace(tmp_path, self.path)
+        except OSError:
+            self.discard()
+
+    def read(self, json_path: str) -> Optional[dict]:
+        """缓存与 json_path 一致时返回快照内容（不含 checksum），否则返回 None"""
+        try:
+            stat = os.stat(json_path)
+            with open(self.path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m:
+                if m[:len(self.MAGIC)] != self.MAGIC:
+                    return None
+                offset = len(self.MAGIC)
+                (header_len,) = struct.unpack_from("<I", m, offset)
+                offset += 4
+                header = json.loads(m[offset:offset + header_len])
+                offset += header_len
+                if (
+                    header.get("version") != self.VERSION
+                    or header.get("json_mtime_ns") != stat.st_mtime_ns
+                    or header.get("json_size") != stat.st_size
+                ):
+                    return None
+                sections = []
+                for _ in range(2 + len(self.STRING_COLUMNS)):
+                    (length,) = struct.unpack_from("<Q", m, offset)
+                    offset += 8
+                    if offset + length > len(m):
+                        return None
+                    sections.append(m[offset:offset + length])
+                    offset += length
+            with open(json_path, "rb") as f:
+                if hashlib.sha256(f.read()).hexdigest() != header.get("json_sha256"):
+                    return None
+
+            count = header["count"]
+            quadrants = header["quadrants"]
+            quadrant_col, done_col = sections[0], sections[1]
+            strings = [s.decode("utf-8").split("\0") if count else [] for s in sections[2:]]
+            if len(quadrant_col) != count or len(done_col) != count or any(len(s) != count for s in strings):
+                return None
+            data = dict(header["meta"])
+            data["tasks"] = [
+                {
+                    "id": task_id,
+                    "content": content,
+                    "created_at": created_at,
+                    "finished_at": finished_at,
+                    "is_done": bool(done),
+                    "quadrant": quadrants[q],
+                }
+                for q, done, task_id, content, created_at, finished_at in zip(quadrant_col, done_col, *strings)
+            ]
+            return data
+        except (OSError, ValueError, KeyError, IndexError, TypeError, struct.error):
+            return None
+
+
+def fsync_dir(path: str):
+    """同步文件所在目录，确保重命名本身落盘（Windows 不支持，直接跳过）"""
+    if sys.platform == "win32":
+        return
+    try:
+        fd = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+class SqliteStorage(StateStorage):
+    """
+    SQLite 后端（WAL 模式）。每条改动记录直接转换为行级更新，
+    任务按 (quadrant, position) 建索引，读取时按象限顺序流式取出。
+    任务表始终与改动记录同步，因此快照只需更新设置项，
+    只有在 needs_compact 时才整表重写任务。
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS meta (
+            key TEXT PRIMARY KEY,
+            value TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS tasks (
+            id INTEGER PRIMARY KEY,
+            uid TEXT,
+            quadrant TEXT NOT NULL,
+            position INTEGER NOT NULL,
+            content TEXT NOT NULL,
+            created_at TEXT,
+            finished_at TEXT,
+            is_done INTEGER NOT NULL DEFAULT 0
+        );
+        CREATE INDEX IF NOT EXISTS idx_tasks_position ON tasks (quadrant, position);
+        CREATE INDEX IF NOT EXISTS idx_tasks_done ON tasks (is_done);
+    """
+
+    def __init__(self, db_path: str):
+        super().__init__()
+        self.db_path = db_path
+        # 加载在界面线程，之后的写入都在后台写盘线程，用锁保证同一时间只有一个线程使用连接
+        self._lock = threading.Lock()
+        import sqlite3  # 只有使用 SQLite 后端时才需要，不拖慢启动
+
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(self.SCHEMA)
+        # 旧版本的数据库没有任务 ID 列
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(tasks)")}
+        if "uid" not in columns:
+            self._conn.execute("ALTER TABLE tasks ADD COLUMN uid TEXT")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_tasks_uid ON tasks (uid)")
+
+    def is_empty(self) -> bool:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT (SELECT COUNT(*) FROM meta) + (SELECT COUNT(*) FROM tasks)"
+            ).fetchone()
+        return row[0] == 0
+
+    def load(self) -> Optional[dict]:
+        if self.is_empty():
+            return None
+        with self._lock:
+            data = {
+                key: json.loads(value)
+                for key, value in self._conn.execute("SELECT key, value FROM meta")
+            }
+            data["tasks"] = [
+                {
+                    "id": uid,
+                    "content": content,
+                    "quadrant": quadrant,
+                    "created_at": created_at,
+                    "finished_at": finished_at,
+                    "is_done": bool(is_done),
+                }
+                for uid, quadrant, content, created_at, finished_at, is_done in self._conn.execute(
+                    "SELECT uid, quadrant, content, created_at, finished_at, is_done "
+                    "FROM tasks ORDER BY quadrant, position"
+                )
+            ]
+        return data
+
+    def append_many(self, records: list):
+        with self._lock, self._conn:
+            for record in records:
+                self._apply(record)
+        self.pending += len(records)
+
+    def _apply(self, record: dict):
+        """把一条改动记录转换为行级 SQL（与 apply_journal_record 语义一致）"""
+        op = record.get("op")
+        db = self._conn
+        if op == "meta":
+            self._write_meta(record.get("fields") or {})
+        elif op == "add":
+            self._shift(record["q"], record["row"], 1)
+            self._insert(record["q"], record["row"], [record["task"]])
+        elif op == "add_many":
+            self._shift(record["q"], record["row"], len(record["tasks"]))
+            self._insert(record["q"], record["row"], record["tasks"])
+        elif op in ("update", "move", "delete"):
+            located = self._locate(record)
+            if located is None:
+                return
+            task_id, quadrant, row = located
+            if op == "update":
+                fields = record.get("fields") or {}
+                columns = [c for c in ("content", "created_at", "finished_at", "is_done") if c in fields]
+                if columns:
+                    db.execute(
+                        f"UPDATE tasks SET {', '.join(c + ' = ?' for c in columns)} WHERE id = ?",
+                        [fields[c] for c in columns] + [task_id],
+                    )
+            elif op == "move":
+                self._shift(quadrant, row + 1, -1)
+                self._shift(record["to_q"], record["to_row"], 1, exclude=task_id)
+                db.execute(
+                    "UPDATE tasks SET quadrant = ?, position = ? WHERE id = ?",
+                    (record["to_q"], record["to_row"], task_id),
+                )
+            else:
+                db.execute("DELETE FROM tasks WHERE id = ?", (task_id,))
+                self._shift(quadrant, row + 1, -1)
+        elif op == "batch":
+            for sub in record["records"]:
+                self._apply(sub)
+
+    def _locate(self, record: dict) -> Optional[tuple]:
+        """返回记录所指任务的 (行 id, 象限, 位置)，与 locate_record_task 一样优先按任务 ID 查找"""
+        if record.get("id") is not None:
+            return self._conn.execute(
+                "SELECT id, quadrant, position FROM tasks WHERE uid = ?", (record["id"],)
+            ).fetchone()
+        found = self._conn.execute(
+            "SELECT id, quadrant, position FROM tasks WHERE quadrant = ? AND position = ?",
+            (record["q"], record["row"]),
+        ).fetchone()
+        if found is None:
+            raise KeyError((record["q"], record["row"]))
+        return found
+
+    def _shift(self, quadrant: str, from_row: int, delta: int, exclude: Optional[int] = None):
+        """把象限中 position >= from_row 的任务整体平移 delta"""
+        self._conn.execute(
+            "UPDATE tasks SET position = position + ? "
+            "WHERE quadrant = ? AND position >= ? AND id IS NOT ?",
+            (delta, quadrant, from_row, exclude),
+        )
+
+    def _insert(self, quadrant: str, row: int, tasks: list):
+        self._conn.executemany(
+            "INSERT INTO tasks (uid, quadrant, position, content, created_at, finished_at, is_done) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            [
+                (t.get("id"), quadrant, row + i, t["content"], t.get("created_at"), t.get("finished_at"), int(bool(t.get("is_done"))))
+                for i, t in enumerate(tasks)
+            ],
+        )
+
+    def _write_meta(self, fields: dict):
+        self._conn.executemany(
+            "INSERT INTO meta (key, value) VALUES (?, ?) "
+            "ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+            [(k, json.dumps(v, ensure_ascii=False)) for k, v in fields.items()],
+        )
+
+    def compact(self, data: dict):
+        tasks = data.get("tasks") or []
+        with self._lock, self._conn:
+            self._write_meta({k: v for k, v in data.items() if k != "tasks"})
+            if self.needs_compact:
+                self._conn.execute("DELETE FROM tasks")
+                positions = {}
+                rows = []
+                for t in tasks:
+                    q = t.get("quadrant", DEFAULT_QUADRANT)
+                    pos = positions.get(q, 0)
+                    positions[q] = pos + 1
+                    rows.append((t.get("id"), q, pos, t["content"], t.get("created_at"), t.get("finished_at"), int(bool(t.get("is_done")))))
+                self._conn.executemany(
+                    "INSERT INTO tasks (uid, quadrant, position, content, created_at, finished_at, is_done) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    rows,
+                )
+        self.pending = 0
+        self.needs_compact = False
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+STORAGE_BACKENDS = {"json": "JSON 文件", "sqlite": "SQLite 数据库"}
+
+
+def open_storage(backend: str, data_file: str) -> StateStorage:
+    """按名称创建存储后端；SQLite 数据库与 JSON 文件放在同一目录"""
+    if backend == "sqlite":
+        return SqliteStorage(os.path.splitext(data_file)[0] + ".db")
+    return JsonStorage(data_file)
+
+
+class StateWriter(threading.Thread):
+    """
+    后台写盘线程。界面线程只提交改动记录或完整快照（提交后不再修改），
+    由此线程在 interval_ms 内合并连续的改动，最多每个间隔写一次磁盘。
+    """
+
+    def __init__(self, storage: StateStorage, interval_ms: int = 500, archive=None):
+        super().__init__(name="StateWriter", daemon=True)
+        self.storage = storage
+        self.archive = archive
+        self.interval_ms = interval_ms
+        self.since_snapshot = 0  # 自上次快照以来提交的记录数
+        self._cond = threading.Condition()
+        self._records = []
+        self._snapshot = None
+        self._archived = []  # 待追加到归档的任务
+        self._busy = False
+        self._paused = False
+        self._flush_requested = False
+        self._stopping = False
+
+    def submit_record(self, record: dict) -> bool:
+        """提交一条改动记录，返回是否已到达压缩阈值（需要提交新快照）"""
+        with self._cond:
+            self._records.append(record)
+            self.since_snapshot += 1
+            self._cond.notify_all()
+            threshold = self.storage.compact_threshold
+            return threshold is not None and self.since_snapshot >= threshold
+
+    def submit_archive(self, entries: list):
+        """提交要追加到归档的任务；总是先于同一轮的改动记录写出"""
+        with self._cond:
+            self._archived.extend(entries)
+            self._cond.notify_all()
+
+    def submit_snapshot(self, data: dict):
+        """提交完整快照；快照已包含此前所有改动，尚未写出的记录直接丢弃"""
+        with self._cond:
+            self._snapshot = data
+            self._records = []
+            self.since_snapshot = 0
+            self._cond.notify_all()
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """立即写出所有待写内容并等待完成，返回是否在超时前写完"""
+        with self._cond:
+            self._flush_requested = True
+            self._cond.notify_all()
+            return self._cond.wait_for(lambda: not self._has_work() and not self._busy, timeout)
+
+    def stop(self, timeout: float = 5.0):
+        """写出剩余内容后结束线程"""
+        self.flush(timeout)
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+        self.join(timeout)
+        self.storage.close()
+
+    def has_pending(self) -> bool:
+        """是否还有提交了但尚未写出的内容"""
+        with self._cond:
+            return self._has_work() or self._busy
+
+    def discard_records(self) -> list:
+        """取出并丢弃尚未写出的改动记录（内存中的任务将被磁盘上的完整状态替换时使用）"""
+        with self._cond:
+            records, self._records = self._records, []
+            self.since_snapshot = 0
+            return records
+
+    @contextmanager
+    def paused(self):
+        """暂停写盘：等待正在进行的写入完成，期间不开始新的写入"""
+        with self._cond:
+            self._paused = True
+            self._cond.wait_for(lambda: not self._busy)
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._paused = False
+                self._cond.notify_all()
+
+    def set_storage(self, storage: StateStorage):
+        """切换存储后端：先写完旧后端中待写的内容"""
+        self.flush()
+        with self._cond:
+            old, self.storage = self.storage, storage
+            self.since_snapshot = storage.pending
+        old.close()
+
+    def _has_work(self) -> bool:
+        return self._snapshot is not None or bool(self._records) or bool(self._archived)
+
+    def run(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: (self._has_work() and not self._paused) or self._stopping)
+                if not self._has_work():
+                    return
+                # 等待一个间隔，把这段时间内的连续改动合并成一次写入
+                if not (self._flush_requested or self._stopping):
+                    self._cond.wait_for(
+                        lambda: self._flush_requested or self._stopping,
+                        self.interval_ms / 1000,
+                    )
+                if self._paused:
+                    continue
+                snapshot, records, archived = self._snapshot, self._records, self._archived
+                self._snapshot, self._records, self._archived = None, [], []
+                self._busy = True
+
+            failed = False
+            try:
+                # 先写归档，再写把任务移出看板的改动，崩溃时最多在归档中留下重复项
+                if archived:
+                    self.archive.append(archived)
+                    archived = []
+                if snapshot is not None:
+                    self.storage.compact(snapshot)
+                    snapshot = None
+                if records:
+                    self.storage.append_many(records)
+            except Exception:
+                # 即使保存失败，也不要影响程序运行；放回队列，下一轮重试
+                failed = True
+
+            with self._cond:
+                if failed:
+                    self._archived = archived + self._archived
+                if failed and self._snapshot is None:
+                    # 期间没有新快照：未写出的内容排在新记录之前
+                    self._snapshot = snapshot
+                    self._records = records + self._records
+                self._busy = False
+                if not self._has_work():
+                    self._flush_requested = False
+                self._cond.notify_all()
+            if failed:
+                # 避免磁盘持续出错时空转
+                with self._cond:
+                    self._cond.wait_for(lambda: self._stopping, self.interval_ms / 1000)
+                    if self._stopping:
+                        return
+
+
+class TaskArchive:
+    """
+    已归档任务的只追加存储（NDJSON，每行一个任务）。
+    归档的任务不再参与看板的加载、保存和搜索，只在导出等需要时才读取。
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def append(self, entries: list):
+        lines = "".join(json.dumps(e, ensure_ascii=False) + "\n" for e in entries)
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(lines)
+            f.flush()
+            os.fsync(f.fileno())
+
+    def count(self) -> int:
+        """归档中的任务数（按块统计换行，不解析内容）"""
+        if not os.path.exists(self.path):
+            return 0
+        total = 0
+        with open(self.path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                total += chunk.count(b"\n")
+        return total
+
+    def iter_tasks(self):
+        """逐条读取归档，生成 (象限, TaskItem)"""
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    t = json.loads(line)
+                except ValueError:
+                    continue
+                yield t.get("quadrant", ""), TaskItem(
+                    t.get("content", ""),
+                    created_at=t.get("created_at"),
+                    finished_at=t.get("finished_at", "未完成"),
+                    is_done=t.get("is_done", True),
+                    task_id=t.get("id"),
+                )
+
+
+def select_tasks_to_archive(tasks: list, cutoff: Optional[str], keep_done: int) -> list:
+    """
+    按归档策略挑出要归档的行号（升序）：
+    - 完成时间早于 cutoff（"yyyy-MM-dd HH:mm"）的已完成任务；
+    - 已完成任务超过 keep_done 条时，最早完成的多出部分。
+    """
+    done_rows = [i for i, t in enumerate(tasks) if t.is_done]
+    rows = set()
+    if cutoff:
+        rows.update(i for i in done_rows if tasks[i].finished_at < cutoff)
+    if keep_done:
+        remaining = [i for i in done_rows if i not in rows]
+        if len(remaining) > keep_done:
+            remaining.sort(key=lambda i: tasks[i].finished_at)
+            rows.update(remaining[:len(remaining) - keep_done])
+    return sorted(rows)
+
+
+# --- 3. 导出：流式写出 CSV / JSON / NDJSON ---
+EXPORT_FORMATS = {
+    "csv": ("CSV", "*.csv"),
+    "json": ("JSON", "*.json"),
+    "ndjson": ("NDJSON", "*.ndjson"),
+}
+# 导出字段与 tasks_data.json 中的任务字段一致；CSV 表头使用中文
+EXPORT_FIELDS = ["content", "quadrant", "is_done", "created_at", "finished_at"]
+EXPORT_CSV_HEADERS = ["内容", "象限", "状态", "创建时间", "完成时间"]
+
+
+class ExportFilter:
+    """导出筛选条件：象限、完成状态、创建/完成时间范围（均为 yyyy-MM-dd，含两端），以及可选的查询语句"""
+
+    def __init__(
+        self,
+        quadrants: Optional[set] = None,
+        done: Optional[bool] = None,
+        created_from: Optional[str] = None,
+        created_to: Optional[str] = None,
+        finished_from: Optional[str] = None,
+        finished_to: Optional[str] = None,
+        query: Optional["TaskQuery"] = None,
+    ):
+        self.quadrants = quadrants
+        self.done = done
+        self.created_from = created_from
+        self.created_to = created_to
+        self.finished_from = finished_from
+        self.finished_to = finished_to
+        self.query = query
+
+    def matches(self, quadrant: str, task) -> bool:
+        if self.quadrants is not None and quadrant not in self.quadrants:
+            return False
+        if self.done is not None and task.is_done != self.done:
+            return False
+        # 时间均为 "yyyy-MM-dd HH:mm" 字符串，直接比较日期前缀即可
+        created = (task.created_at or "")[:10]
+        if self.created_from and created < self.created_from:
+            return False
+        if self.created_to and created > self.created_to:
+            return False
+        if self.finished_from or self.finished_to:
+            if not task.is_done:
+                return False
+            finished = (task.finished_at or "")[:10]
+            if self.finished_from and finished < self.finished_from:
+                return False
+            if self.finished_to and finished > self.finished_to:
+                return False
+        if self.query is not None and not self.query.matches(quadrant, task):
+            return False
+        return True
+
+
+def iter_export_rows(sources, export_filter: ExportFilter, archive: Optional[TaskArchive] = None):
+    """
+    逐条生成要导出的任务字典。
+    sources 为 [(象限名, 任务序列), ...]，每次只产出一条，不在内存中拼整份结果；
+    传入 archive 时，在看板任务之后继续逐行读取归档。
+    生成 (已检查数, 行) ，便于调用方报告进度。
+    """
+    pairs = ((quadrant, task) for quadrant, tasks in sources for task in tasks)
+    if archive is not None:
+        pairs = itertools.chain(pairs, archive.iter_tasks())
+    checked = 0
+    for quadrant, task in pairs:
+        checked += 1
+        if export_filter.matches(quadrant, task):
+            yield checked, dict(task.to_dict(), quadrant=quadrant)
+        elif checked % 1000 == 0:
+            # 大段不匹配时也让调用方有机会更新进度 / 响应取消
+            yield checked, None
+
+
+def write_export(path: str, fmt: str, rows, progress=None, cancel_event=None) -> Optional[int]:
+    """
+    把 rows（iter_export_rows 的输出）流式写入文件，返回写出的条数；被取消时返回 None。
+    先写临时文件，完成后再替换目标文件，取消或出错时不会留下半个文件。
+    """
+    tmp_path = path + ".part"
+    written = 0
+    checked = 0
+    encoding = "utf-8-sig" if fmt == "csv" else "utf-8"  # CSV 带 BOM，方便 Excel 打开
+    try:
+        with open(tmp_path, "w", newline="", encoding=encoding) as f:
+            if fmt == "csv":
+                import csv
+
+                writer = csv.writer(f)
+                writer.writerow(EXPORT_CSV_HEADERS)
+            elif fmt == "json":
+                f.write("[")
+            for checked, row in rows:
+                if cancel_event is not None and cancel_event.is_set():
+                    return None
+                if row is not None:
+                    if fmt == "csv":
+                        writer.writerow([
+                            row["content"],
+                            row["quadrant"],
+                            "已完成" if row["is_done"] else "未完成",
+                            row["created_at"],
+                            row["finished_at"],
+                        ])
+                    else:
+                        line = json.dumps({k: row[k] for k in EXPORT_FIELDS}, ensure_ascii=False)
+                        if fmt == "json":
+                            f.write(("\n  " if written == 0 else ",\n  ") + line)
+                        else:
+                            f.write(line + "\n")
+                    written += 1
+                if progress is not None and checked % 500 == 0:
+                    progress(checked)
+            if fmt == "json":
+                f.write("\n]\n" if written else "]\n")
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    if progress is not None:
+        progress(checked)
+    return written
+
+
+# --- 4. 导入：流式读取 CSV / NDJSON ---
+# CSV 表头（中文或英文）到任务字段的映射，与导出格式互为逆操作
+IMPORT_COLUMNS = {
+    "内容": "content",
+    "content": "content",
+    "象限": "quadrant",
+    "quadrant": "quadrant",
+    "状态": "is_done",
+    "is_done": "is_done",
+    "创建时间": "created_at",
+    "created_at": "created_at",
+    "完成时间": "finished_at",
+    "finished_at": "finished_at",
+}
+IMPORT_TIME_FORMATS = ("%Y-%m-%d %H:%M", "%Y-%m-%d %H:%M:%S", "%Y-%m-%dT%H:%M", "%Y-%m-%dT%H:%M:%S", "%Y-%m-%d")
+
+
+def parse_import_time(value) -> Optional[str]:
+    """把导入文件中的时间统一为 "yyyy-MM-dd HH:mm"，无法识别时返回 None"""
+    value = str(value or "").strip()
+    for fmt in IMPORT_TIME_FORMATS:
+        try:
+            return datetime.strptime(value, fmt).strftime("%Y-%m-%d %H:%M")
+        except ValueError:
+            continue
+    return None
+
+
+def parse_import_done(value) -> bool:
+    if isinstance(value, bool):
+        return value
+    return str(value or "").strip().lower() in ("已完成", "true", "1", "yes", "done", "是")
+
+
+def validate_import_row(row: dict, quadrant_names, default_quadrant: str) -> dict:
+    """校验并规范化一行导入数据，返回任务字典（含 quadrant）；不合法时抛出 ValueError"""
+    content = str(row.get("content") or "").strip()
+    if not content:
+        raise ValueError("内容为空")
+
+    quadrant = str(row.get("quadrant") or "").strip() or default_quadrant
+    if quadrant not in quadrant_names:
+        raise ValueError(f"未知象限：{quadrant}")
+
+    created_at = datetime.now().strftime("%Y-%m-%d %H:%M")
+    if row.get("created_at"):
+        created_at = parse_import_time(row["created_at"])
+        if created_at is None:
+            raise ValueError(f"创建时间格式错误：{row['created_at']}")
+
+    is_done = parse_import_done(row.get("is_done"))
+    finished_at = "未完成"
+    if is_done:
+        raw = row.get("finished_at")
+        if raw and raw != "未完成":
+            finished_at = parse_import_time(raw)
+            if finished_at is None:
+                raise ValueError(f"完成时间格式错误：{raw}")
+        else:
+            finished_at = created_at
+
+    return {
+        "content": content,
+        "quadrant": quadrant,
+        "created_at": created_at,
+        "finished_at": finished_at,
+        "is_done": is_done,
+    }
+
+
+def iter_import_rows(text_file, fmt: str):
+    """逐行解析导入文件，生成 (行号, 原始字段字典)；不把整个文件读入内存"""
+    if fmt == "csv":
+        import csv
+
+        reader = csv.reader(text_file)
+        header = next(reader, None)
+        if header is None:
+            return
+        fields = [IMPORT_COLUMNS.get(h.strip()) for h in header]
+        if "content" not in fields:
+            raise ValueError("CSV 缺少“内容”(content) 列")
+        for line_no, values in enumerate(reader, start=2):
+            if not any(values):
+                continue
+            yield line_no, {f: v for f, v in zip(fields, values) if f}
+    else:
+        for line_no, line in enumerate(text_file, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError:
+                yield line_no, None
+                continue
+            yield line_no, row if isinstance(row, dict) else None
+
+
+# --- 5. 搜索：倒排索引 ---
+def normalize_search_text(text: str) -> str:
+    """统一全角/半角并忽略大小写，便于中英文混合搜索"""
+    return unicodedata.normalize("NFKC", text).casefold()
+
+
+def search_grams(text: str) -> set:
+    """
+    把已规范化的文本切成索引词元。
+    中文没有空格分词，按相邻两字（bigram）切分；英文、数字同样按两字符切分，
+    这样输入单词的一部分也能命中。只有一个字符的词直接作为词元。
+    """
+    grams = set()
+    for word in text.split():
+        if len(word) == 1:
+            grams.add(word)
+        else:
+            grams.update(word[i:i + 2] for i in range(len(word) - 1))
+    return grams
+
+
+class QueryError(ValueError):
+    """查询语句无法解析"""
+
+
+# 字段名 -> 允许的比较符
+QUERY_FIELDS = {
+    "quadrant": (":", "="),
+    "done": (":", "="),
+    "text": (":", "="),
+    "created": (":", "=", ">", ">=", "<", "<="),
+    "finished": (":", "=", ">", ">=", "<", "<="),
+}
+QUERY_TOKEN_RE = re.compile(r'(?:[^\s"]*"[^"]*"?)+[^\s"]*|\S+')
+QUERY_TERM_RE = re.compile(r"([A-Za-z]+)(>=|<=|>|<|:|=)(.*)", re.S)
+QUERY_TIME_RE = re.compile(r"\d{4}(-\d{2}(-\d{2}([ T]\d{2}(:\d{2})?)?)?)?")
+QUERY_BOOLS = {
+    "true": True, "yes": True, "1": True, "是": True, "已完成": True,
+    "false": False, "no": False, "0": False, "否": False, "未完成": False,
+}
+QUERY_HELP = (
+    "关键字按内容搜索，可以组合以下条件（空格分隔，同时满足）：\n"
+    "quadrant:紧急重要　象限，可用逗号列出多个\n"
+    "done:true / done:false　完成状态\n"
+    "created>2026-01-01　创建时间，支持 : > >= < <= 和 2026-01..2026-03 区间\n"
+    "finished>=2026-01　完成时间，写法同上\n"
+    'text:报告　内容关键字；用引号括起来的短语整体匹配，如 text:"周 报"'
+)
+# 比时间字符串中任何字符都大，"前缀 + 它" 就是所有以该前缀开头的时间的上界
+TIME_PREFIX_END = "\uffff"
+
+
+def parse_time_range(op: str, value: str) -> tuple:
+    """
+    把时间条件换成左闭右开的字符串区间 (lo, hi)，None 表示不限。
+    值可以只写到年、月、日或分钟，按前缀理解：created>2026-01 表示 2026 年 1 月之后，
+    created:2026-01-01..2026-01-31 表示这段日期（含两端）
+    """
+    if op in (":", "=") and ".." in value:
+        start, _, end = value.partition("..")
+        lo = parse_time_range(">=", start)[0] if start else None
+        hi = parse_time_range("<=", end)[1] if end else None
+        return lo, hi
+    if not QUERY_TIME_RE.fullmatch(value):
+        raise QueryError(f"无法识别的时间：{value}（应为 yyyy-MM-dd 或 yyyy-MM-dd HH:mm）")
+    prefix = value.replace("T", " ")
+    if op == ">":
+        return prefix + TIME_PREFIX_END, None
+    if op == ">=":
+        return prefix, None
+    if op == "<":
+        return None, prefix
+    if op == "<=":
+        return None, prefix + TIME_PREFIX_END
+    return prefix, prefix + TIME_PREFIX_END
+
+
+def in_time_range(value: str, time_range: tuple) -> bool:
+    lo, hi = time_range
+    return (lo is None or value >= lo) and (hi is None or value < hi)
+
+
+class TaskQuery:
+    """
+    解析后的查询语句，各条件之间为“并且”：
+        quadrant:紧急重要 done:false created>2026-01-01 text:报告
+    不带字段名的词按内容关键字处理，和原来的搜索一样；用双引号括起来的内容（可含空格）作为一个短语匹配。
+    quadrant 可用逗号列出多个象限；created / finished 支持 : = > >= < <= 和 a..b 区间
+    """
+
+    def __init__(self):
+        self.text = []  # 规范化后的内容关键字
+        self.quadrants: Optional[set] = None
+        self.done: Optional[bool] = None
+        self.created = []  # 时间区间列表，见 parse_time_range
+        self.finished = []
+        self.never_matches = False  # 条件互相矛盾（如同时要求已完成和未完成）
+
+    @classmethod
+    def parse(cls, query: str) -> "TaskQuery":
+        parsed = cls()
+        for token in QUERY_TOKEN_RE.findall(query or ""):
+            match = QUERY_TERM_RE.fullmatch(token)
+            field = match.group(1).lower() if match else None
+            if field not in QUERY_FIELDS:
+                # 普通关键字（包括 "a:b" 这类不是字段名的写法）
+                parsed._add_text(token)
+                continue
+            op, value = match.group(2), match.group(3)
+            if op not in QUERY_FIELDS[field]:
+                raise QueryError(f"{field} 不支持比较符 {op}")
+            if field == "text":
+                if not parsed._add_text(value):
+                    raise QueryError("text 缺少条件值")
+                continue
+            value = value.replace('"', "").strip()
+            if not value:
+                raise QueryError(f"{field} 缺少条件值")
+            if field == "quadrant":
+                names = {name.strip() for name in value.split(",") if name.strip()}
+                unknown = names - set(QUADRANT_NAMES)
+                if unknown:
+                    raise QueryError(f"未知的象限：{'、'.join(sorted(unknown))}")
+                parsed.quadrants = names if parsed.quadrants is None else parsed.quadrants & names
+            elif field == "done":
+                done = QUERY_BOOLS.get(value.lower())
+                if done is None:
+                    raise QueryError(f"done 只能是 true 或 false：{value}")
+                if parsed.done is not None and parsed.done != done:
+                    parsed.never_matches = True
+                parsed.done = done
+            else:
+                getattr(parsed, field).append(parse_time_range(op, value))
+        return parsed
+
+    def _add_text(self, raw: str) -> bool:
+        """加入一个内容关键字；引号中的短语保留为一个关键字（空格规整为一个）。返回是否加入"""
+        term = " ".join(normalize_search_text(raw.replace('"', "")).split())
+        if term:
+            self.text.append(term)
+        return bool(term)
+
+    def is_empty(self) -> bool:
+        return (
+            not self.text and self.quadrants is None and self.done is None
+            and not self.created and not self.finished and not self.never_matches
+        )
+
+    def matches(self, quadrant: str, task) -> bool:
+        """逐条判断一个任务（导出、归档等没有索引的场合使用）"""
+        if self.never_matches:
+            return False
+        if self.quadrants is not None and quadrant not in self.quadrants:
+            return False
+        if self.done is not None and task.is_done != self.done:
+            return False
+        if self.text:
+            text = normalize_search_text(task.content)
+            if not all(term in text for term in self.text):
+                return False
+        created = task.created_at or ""
+        if not all(in_time_range(created, r) for r in self.created):
+            return False
+        if self.finished:
+            if not task.is_done:
+                return False
+            finished = task.finished_at or ""
+            if not all(in_time_range(finished, r) for r in self.finished):
+                return False
+        return True
+
+
+class SortedColumn:
+    """
+    按时间字符串排序的 (时间, 任务) 两个平行列表，区间查询用二分查找。
+    批量加入的先暂存，到下一次查询或删除时才一起排序，分批建索引时不必每批都重排
+    """
+
+    def __init__(self):
+        self.keys = []
+        self.tasks = []
+        self._unsorted = []
+
+    def clear(self):
+        self.keys = []
+        self.tasks = []
+        self._unsorted = []
+
+    def add(self, key: str, task):
+        if self._unsorted:
+            self._unsorted.append((key, task))
+            return
+        i = bisect_right(self.keys, key)
+        self.keys.insert(i, key)
+        self.tasks.insert(i, task)
+
+    def extend(self, pairs):
+        # 每批先排好，最后整理时 Timsort 只需归并这些有序段
+        self._unsorted.extend(sorted(pairs, key=lambda p: p[0]))
+
+    @property
+    def settled(self) -> bool:
+        return not self._unsorted
+
+    def settle(self):
+        if not self._unsorted:
+            return
+        keys = self.keys + [key for key, _ in self._unsorted]
+        tasks = self.tasks + [task for _, task in self._unsorted]
+        self._unsorted = []
+        order = sorted(range(len(keys)), key=keys.__getitem__)
+        self.keys = [keys[i] for i in order]
+        self.tasks = [tasks[i] for i in order]
+
+    def remove(self, key: str, task):
+        self.settle()
+        i = bisect_left(self.keys, key)
+        while i < len(self.keys) and self.keys[i] == key:
+            if self.tasks[i] is task:
+                del self.keys[i]
+                del self.tasks[i]
+                return
+            i += 1
+
+    def span(self, time_range: tuple) -> tuple:
+        """区间内任务在列表中的下标范围 (start, end)"""
+        self.settle()
+        lo, hi = time_range
+        start = 0 if lo is None else bisect_left(self.keys, lo)
+        end = len(self.keys) if hi is None else bisect_left(self.keys, hi)
+        return start, end
+
+    def select(self, time_range: tuple) -> list:
+        start, end = self.span(time_range)
+        return self.tasks[start:end]
+
+
+class SearchIndex:
+    """
+    四个象限共用的索引：词元 -> 包含该词元的任务集合（倒排索引），
+    另外按完成状态分组、按创建/完成时间排序，供 TaskQuery 的结构化条件使用。
+    增删任务时增量维护；已有的任务由 start_build() / build_step() 在空闲时分批加入，不拖慢启动。
+    """
+
+    # 一次加入超过这么多任务时，时间列整体重排而不是逐条插入
+    BULK_SORT_MIN = 64
+
+    def __init__(self):
+        self.built = False
+        self._postings = {}  # 词元 -> 任务集合
+        self._keys_by_char = {}  # 单个字符 -> 包含它的词元（用于单字查询）
+        self._text = {}  # 任务 -> 规范化后的内容
+        self._fields = {}  # 任务 -> 建索引时的 (创建时间, 完成时间或 None)
+        self._done = set()  # 已完成的任务
+        self._undone = set()  # 未完成的任务
+        self._created = SortedColumn()
+        self._finished = SortedColumn()  # 只含已完成的任务
+        self._backlog = deque()  # 分批建索引时尚未加入的任务
+        self._dropped = set()  # 尚未加入就已被移除的任务
+
+    @property
+    def ready(self) -> bool:
+        """索引已包含全部任务"""
+        return self.built and not self._backlog
+
+    def build(self, tasks):
+        """根据全部任务一次建立索引"""
+        self.start_build(tasks)
+        self.finish_build()
+
+    def start_build(self, tasks):
+        """开始分批建立索引：此后的增删立即维护，tasks 中已有的任务由 build_step() 分批加入"""
+        self._postings.clear()
+        self._keys_by_char.clear()
+        self._text.clear()
+        self._fields.clear()
+        self._done.clear()
+        self._undone.clear()
+        self._created.clear()
+        self._finished.clear()
+        self.built = True
+        self._backlog = deque(tasks)
+        self._dropped = set()
+
+    def build_step(self, limit: int) -> bool:
+        """
+        把最多 limit 个待加入的任务加入索引；任务都加入后，每次排好一列时间索引。
+        返回是否已全部完成
+        """
+        backlog = self._backlog
+        if backlog:
+            batch = [backlog.popleft() for _ in range(min(limit, len(backlog)))]
+            if self._dropped:
+                batch = [t for t in batch if t not in self._dropped]
+            self.add_many(batch)
+            if backlog:
+                return False
+            self._dropped.clear()
+        unsettled = [c for c in (self._created, self._finished) if not c.settled]
+        if unsettled:
+            unsettled[0].settle()
+        return len(unsettled) <= 1
+
+    def finish_build(self):
+        while not self.build_step(len(self._backlog)):
+            pass
+
+    def add_many(self, tasks):
+        if not self.built:
+            return
+        tasks = list(tasks)
+        self._add_fields(tasks)
+        for task in tasks:
+            text = normalize_search_text(task.content)
+            self._text[task] = text
+            for gram in search_grams(text):
+                posting = self._postings.get(gram)
+                if posting is None:
+                    posting = self._postings[gram] = set()
+                    for ch in gram:
+                        self._keys_by_char.setdefault(ch, set()).add(gram)
+                posting.add(task)
+
+    def add(self, task):
+        self.add_many((task,))
+
+    def _add_fields(self, tasks):
+        created, finished = [], []
+        for task in tasks:
+            finished_at = task.finished_at if task.is_done else None
+            self._fields[task] = (task.created_at or "", finished_at)
+            created.append((task.created_at or "", task))
+            if finished_at is None:
+                self._undone.add(task)
+            else:
+                self._done.add(task)
+                finished.append((finished_at, task))
+        for column, pairs in ((self._created, created), (self._finished, finished)):
+            if len(pairs) >= self.BULK_SORT_MIN:
+                column.extend(pairs)
+            else:
+                for key, task in pairs:
+                    column.add(key, task)
+
+    def _remove_fields(self, task):
+        fields = self._fields.pop(task, None)
+        if fields is None:
+            return
+        created_at, finished_at = fields
+        self._created.remove(created_at, task)
+        if finished_at is None:
+            self._undone.discard(task)
+        else:
+            self._done.discard(task)
+            self._finished.remove(finished_at, task)
+
+    def remove_many(self, tasks):
+        if not self.built:
+            return
+        for task in tasks:
+            self._remove_fields(task)
+            text = self._text.pop(task, None)
+            if text is None:
+                if self._backlog:
+                    # 还没轮到加入索引，之后也不再加入
+                    self._dropped.add(task)
+                continue
+            for gram in search_grams(text):
+                posting = self._postings.get(gram)
+                if posting is None:
+                    continue
+                posting.discard(task)
+                if not posting:
+                    del self._postings[gram]
+                    for ch in gram:
+                        keys = self._keys_by_char.get(ch)
+                        if keys is not None:
+                            keys.discard(gram)
+                            if not keys:
+                                del self._keys_by_char[ch]
+
+    def remove(self, task):
+        self.remove_many((task,))
+
+    def update(self, task):
+        """任务内容修改后重新索引"""
+        self.remove(task)
+        self.add(task)
+
+    def update_fields(self, task):
+        """任务完成状态或时间变化后（如勾选完成）只更新结构化索引"""
+        if not self.built or task not in self._fields:
+            return
+        self._remove_fields(task)
+        self._add_fields((task,))
+
+    def _estimate(self, word: str) -> int:
+        """不求集合，按倒排索引估计包含 word（不含空格）的任务数上限"""
+        if len(word) == 1:
+            return sum(len(self._postings[gram]) for gram in self._keys_by_char.get(word, ()))
+        return min(len(self._postings.get(gram, ())) for gram in search_grams(word))
+
+    def _candidates(self, word: str, estimate: int) -> Collection:
+        """可能包含 word 的任务；可能是索引内部的集合，调用方不能修改"""
+        if len(word) > 1:
+            return min((self._postings.get(gram, ()) for gram in search_grams(word)), key=len)
+        if estimate >= len(self._text):
+            # 含这个字的词元太多，合并它们的集合比逐个查内容还慢
+            return [t for t, text in self._text.items() if word in text]
+        result = set()
+        for gram in self._keys_by_char.get(word, ()):
+            result |= self._postings[gram]
+        return result
+
+    def _fetch(self, condition: tuple):
+        """取一个条件的全部任务（可能是索引内部的集合，调用方不能修改）"""
+        kind, value = condition
+        if kind == "done":
+            return value
+        if kind == "time":
+            slot, time_range = value
+            return (self._created, self._finished)[slot].select(time_range)
+        # 内容关键字：按估计最少的一个词取候选，除一两个字的单词外还要确认整体出现
+        word = min(value.split(), key=self._estimate)
+        candidates = self._candidates(word, self._estimate(word))
+        if value == word and len(word) <= 2:
+            return candidates
+        return self._narrow(candidates, condition)
+
+    def _narrow(self, tasks, condition: tuple) -> list:
+        """从 tasks 中筛出满足一个条件的任务"""
+        kind, value = condition
+        if kind == "done":
+            return [t for t in tasks if t in value]
+        if kind == "text":
+            text = self._text
+            return [t for t in tasks if value in text[t]]
+        slot, (lo, hi) = value
+        fields = self._fields
+        values = ((t, fields[t][slot]) for t in tasks)
+        return [t for t, v in values if v is not None and (lo is None or v >= lo) and (hi is None or v < hi)]
+
+    def select(self, query: TaskQuery) -> Optional[Collection]:
+        """
+        返回满足查询中内容、完成状态和时间条件的任务（集合或列表，只读）；这些条件都没有时返回 None。
+        象限条件由调用方按 query.quadrants 处理（索引不记录任务所在象限）。
+        只取任务数最少的一个条件的全部任务，再用其余条件逐个筛选，不复制、不合并大集合
+        """
+        if query.never_matches:
+            return set()
+        conditions = []  # (任务数或估计值, 条件)
+        for slot, column, ranges in ((0, self._created, query.created), (1, self._finished, query.finished)):
+            for time_range in ranges:
+                start, end = column.span(time_range)
+                conditions.append((end - start, ("time", (slot, time_range))))
+        if query.done is not None:
+            tasks = self._done if query.done else self._undone
+            conditions.append((len(tasks), ("done", tasks)))
+        for term in query.text:
+            conditions.append((min(self._estimate(w) for w in term.split()), ("text", term)))
+        if not conditions:
+            return None
+        first = min(conditions, key=lambda c: c[0])[1]
+        result = self._fetch(first)
+        for _, condition in conditions:
+            if condition is not first:
+                result = self._narrow(result, condition)
+        if isinstance(result, set) and len(conditions) == 1:
+            # 返回副本，避免调用方拿到索引内部的集合
+            result = set(result)
+        return result
+
+
+# --- 6. 看板：不依赖界面的任务操作 ---
+def default_data_file() -> str:
+    """默认数据文件：与程序放在同一目录的 tasks_data.json"""
+    return os.path.join(os.path.dirname(os.path.abspath(__file__)), "tasks_data.json")
+
+
+def archive_path(data_file: str) -> str:
+    """归档文件与数据文件放在同一目录"""
+    return os.path.splitext(data_file)[0] + "_archive.ndjson"
+
+
+def archive_cutoff(after_days: int, now: Optional[datetime] = None) -> Optional[str]:
+    """完成时间早于该时间（"yyyy-MM-dd HH:mm"）的任务需要归档；after_days 为 0 时不按天数归档"""
+    if not after_days:
+        return None
+    return ((now or datetime.now()) - timedelta(days=after_days)).strftime("%Y-%m-%d %H:%M")
+
+
+def group_state_tasks(tasks, quadrant_names) -> tuple:
+    """
+    把状态中的任务字典按象限分组为 TaskItem 列表，返回 (分组, 跳过数, 重新生成 ID 数)。
+    内容为空或象限未知的任务被跳过；旧数据没有 ID 或 ID 重复时重新生成
+    """
+    grouped = {name: [] for name in quadrant_names}
+    skipped = 0
+    seen_ids = set()
+    new_ids = 0
+    for t in tasks or []:
+        quadrant = t.get("quadrant", DEFAULT_QUADRANT)
+        content = t.get("content", "")
+        if content and quadrant in grouped:
+            task_id = t.get("id")
+            if not task_id or task_id in seen_ids:
+                task_id = None
+                new_ids += 1
+            task = TaskItem(
+                content,
+                created_at=t.get("created_at"),
+                finished_at=t.get("finished_at", "未完成"),
+                is_done=t.get("is_done", False),
+                task_id=task_id,
+            )
+            seen_ids.add(task.id)
+            grouped[quadrant].append(task)
+        else:
+            skipped += 1
+    return grouped, skipped, new_ids
+
+
+class Board:
+    """
+    不依赖界面的看板：四个象限的任务列表 + 存储 + 归档。
+    改动写成与挂件相同的日志记录，两者读写的是同一份数据。
+    只在每次读取、修改时短暂持有存储的文件锁（修改前先读入挂件在此期间写入的改动），
+    导出等耗时操作不加锁，不会让挂件等待；挂件通过文件监视合并命令行写入的改动。
+    """
+
+    def __init__(self, data_file: str, backend: str = "json"):
+        self.data_file = data_file
+        self.storage = open_storage(backend, data_file)
+        self.archive = TaskArchive(archive_path(data_file))
+        self.settings = {}  # 标题、字体、归档策略等设置项，原样写回
+        self.quadrants = {name: [] for name in QUADRANT_NAMES}
+        try:
+            self._set_state(self._load(backend))
+        except BaseException:
+            self.storage.close()
+            raise
+
+    def _set_state(self, data: Optional[dict]):
+        if not data:
+            return
+        self.settings = {k: v for k, v in data.items() if k not in ("tasks", "journal_seq")}
+        self.quadrants, skipped, new_ids = group_state_tasks(data.get("tasks"), QUADRANT_NAMES)
+        if skipped or new_ids:
+            self.storage.needs_compact = True
+
+    @contextmanager
+    def _locked(self):
+        """一次修改期间持有文件锁；其他进程（如挂件）在此之前写入过改动时先重新读取"""
+        with self.storage.lock:
+            records, state = self.storage.read_changes()
+            if records:
+                state = self.storage.load()
+            self._set_state(state)
+            yield
+
+    def _load(self, backend: str) -> Optional[dict]:
+        data = self.storage.load()
+        if data is None and backend != "json":
+            # 第一次使用其他后端：从原有的 JSON 文件迁移数据
+            data = JsonStorage(self.data_file).load()
+            if data is not None:
+                self.storage.needs_compact = True
+        return data
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def record(self, record: dict):
+        """写入一条改动记录，达到压缩阈值时写一次完整快照"""
+        self.storage.append_many([record])
+        threshold = self.storage.compact_threshold
+        if threshold is not None and self.storage.pending >= threshold:
+            self.compact()
+
+    def snapshot(self) -> dict:
+        data = dict(self.settings)
+        data["tasks"] = [
+            dict(task.to_dict(), quadrant=q) for q, tasks in self.quadrants.items() for task in tasks
+        ]
+        return data
+
+    def compact(self):
+        with self._locked():
+            self.storage.compact(self.snapshot())
+
+    def close(self):
+        try:
+            if self.storage.needs_compact:
+                self.compact()
+        finally:
+            self.storage.close()
+
+    def add(self, contents, quadrant: str = DEFAULT_QUADRANT) -> list:
+        """在象限末尾追加任务（空内容忽略），整批只写一条改动记录，返回新任务"""
+        if quadrant not in self.quadrants:
+            raise ValueError(f"未知的象限：{quadrant}")
+        tasks = [TaskItem(text.strip()) for text in contents if text.strip()]
+        if not tasks:
+            return []
+        with self._locked():
+            target = self.quadrants[quadrant]
+            row = len(target)
+            target.extend(tasks)
+            if len(tasks) == 1:
+                self.record({"op": "add", "q": quadrant, "row": row, "task": tasks[0].to_dict()})
+            else:
+                self.record({
+                    "op": "add_many",
+                    "q": quadrant,
+                    "row": row,
+                    "tasks": [task.to_dict() for task in tasks],
+                })
+        return tasks
+
+    def archive_done(
+        self,
+        after_days: Optional[int] = None,
+        keep_done: Optional[int] = None,
+        now: Optional[datetime] = None,
+    ) -> int:
+        """按归档策略（默认使用挂件中的设置）把已完成任务移入归档文件，返回归档条数"""
+        if after_days is None:
+            after_days = int(self.settings.get("archive_after_days", 30))
+        if keep_done is None:
+            keep_done = int(self.settings.get("archive_keep_done", 0))
+        cutoff = archive_cutoff(after_days, now)
+        if not (cutoff or keep_done):
+            return 0
+        archived_at = (now or datetime.now()).strftime("%Y-%m-%d %H:%M")
+        entries = []
+        records = []
+        with self._locked():
+            for q_name, tasks in self.quadrants.items():
+                rows = select_tasks_to_archive(tasks, cutoff, keep_done)
+                if not rows:
+                    continue
+                entries.extend(dict(tasks[row].to_dict(), quadrant=q_name, archived_at=archived_at) for row in rows)
+                # 从后往前删除，前面的行号不受影响
+                records.extend(
+                    {"op": "delete", "q": q_name, "row": row, "id": tasks[row].id} for row in reversed(rows)
+                )
+                removed = set(rows)
+                self.quadrants[q_name] = [t for i, t in enumerate(tasks) if i not in removed]
+            if entries:
+                # 与挂件相同：先写归档，再写把任务移出看板的改动
+                self.archive.append(entries)
+                self.record({"op": "batch", "records": records})
+        return len(entries)
+
+    def export(
+        self,
+        path: str,
+        fmt: str,
+        export_filter: Optional[ExportFilter] = None,
+        include_archive: bool = False,
+    ) -> int:
+        """按筛选条件流式导出任务，返回导出条数"""
+        rows = iter_export_rows(
+            list(self.quadrants.items()),
+            export_filter or ExportFilter(),
+            self.archive if include_archive else None,
+        )
+        return write_export(path, fmt, rows)
+
+
+# --- 7. 命令行：python -m task_core ---
+def build_parser():
+    import argparse  # 只有命令行才需要
+
+    parser = argparse.ArgumentParser(
+        prog="python -m task_core",
+        description="四象限任务清单的命令行工具（不需要图形界面）",
+    )
+    parser.add_argument("--data", default=default_data_file(), help="数据文件路径，默认为程序目录下的 tasks_data.json")
+    parser.add_argument("--backend", choices=sorted(STORAGE_BACKENDS), default="json", help="存储后端，需与挂件设置一致")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    add = commands.add_parser("add", help="添加任务")
+    add.add_argument("contents", nargs="*", help="任务内容；省略时从标准输入逐行读取")
+    add.add_argument("-q", "--quadrant", choices=QUADRANT_NAMES, default=DEFAULT_QUADRANT)
+
+    export = commands.add_parser("export", help="导出任务")
+    export.add_argument("path", help="导出文件路径")
+    export.add_argument("-f", "--format", choices=sorted(EXPORT_FORMATS), help="默认按文件扩展名判断")
+    export.add_argument("-q", "--quadrant", action="append", choices=QUADRANT_NAMES, help="只导出指定象限，可重复")
+    status = export.add_mutually_exclusive_group()
+    status.add_argument("--done", dest="done", action="store_const", const=True, help="只导出已完成的任务")
+    status.add_argument("--undone", dest="done", action="store_const", const=False, help="只导出未完成的任务")
+    for name in ("created-from", "created-to", "finished-from", "finished-to"):
+        export.add_argument(f"--{name}", metavar="yyyy-MM-dd")
+    export.add_argument("--query", help='查询语句，如 "quadrant:紧急重要 done:false created>2026-01-01 text:报告"')
+    export.add_argument("--include-archive", action="store_true", help="同时导出已归档的任务")
+
+    archive = commands.add_parser("archive", help="把已完成的任务移入归档文件")
+    archive.add_argument("--days", type=int, help="完成超过 N 天的任务，默认使用挂件中的设置")
+    archive.add_argument("--keep", type=int, help="每个象限最多保留 M 条已完成任务，默认使用挂件中的设置")
+    return parser
+
+
+def main(argv=None) -> int:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    fmt = None
+    if args.command == "export":
+        fmt = args.format or os.path.splitext(args.path)[1].lstrip(".").lower()
+        if fmt not in EXPORT_FORMATS:
+            parser.error("无法从扩展名判断导出格式，请使用 --format 指定")
+        try:
+            query = TaskQuery.parse(args.query) if args.query else None
+        except QueryError as e:
+            parser.error(str(e))
+
+    with Board(args.data, args.backend) as board:
+        if args.command == "add":
+            contents = args.contents or [line.rstrip("\n") for line in sys.stdin]
+            tasks = board.add(contents, args.quadrant)
+            print(f"已添加 {len(tasks)} 条任务到“{args.quadrant}”")
+        elif args.command == "export":
+            export_filter = ExportFilter(
+                quadrants=set(args.quadrant) if args.quadrant else None,
+                done=args.done,
+                created_from=args.created_from,
+                created_to=args.created_to,
+                finished_from=args.finished_from,
+                finished_to=args.finished_to,
+                query=query,
+            )
+            written = board.export(args.path, fmt, export_filter, args.include_archive)
+            print(f"已导出 {written} 条任务到 {args.path}")
+        elif args.command == "archive":
+            archived = board.archive_done(args.days, args.keep)
+            print(f"已归档 {archived} 条任务")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,9 +1,72 @@
 import sys
 import os
-import csv
+import io
 import json
+import time
+import hashlib
+import threading
+import functools
+from collections import deque
 from datetime import datetime
 from typing import Optional
+
+# 启动计时起点（启动耗时报告中包含导入 PyQt 的时间）
+STARTED_AT = time.perf_counter()
+
+# 单实例转发只用到 QtNetwork：后启动的实例在导入界面模块和 task_core 之前就转发命令行并退出
+from PyQt6.QtNetwork import QLocalServer, QLocalSocket
+
+
+def app_data_file() -> str:
+    """数据文件路径：打包后在可执行文件目录，开发时在脚本目录"""
+    if getattr(sys, 'frozen', False):
+        return os.path.join(os.path.dirname(sys.executable), "tasks_data.json")
+    return os.path.join(os.path.dirname(os.path.abspath(__file__)), "tasks_data.json")
+
+
+def instance_server_name(data_file: str) -> str:
+    """同一个数据文件只运行一个实例；不同目录下的数据互不影响"""
+    digest = hashlib.sha1(os.path.abspath(data_file).encode("utf-8")).hexdigest()[:12]
+    return f"EisenhowerDesktopTask-{digest}"
+
+
+def forward_to_running_instance(server_name: str, argv: list, timeout_ms: int = 1000) -> Optional[dict]:
+    """
+    已有实例在运行时把命令行参数发给它，返回其回复 {"ok", "message"}；
+    没有运行中的实例时返回 None。不需要 QApplication，在创建界面之前调用
+    """
+    socket = QLocalSocket()
+    socket.connectToServer(server_name)
+    if not socket.waitForConnected(timeout_ms):
+        return None
+    socket.write((json.dumps({"argv": argv}, ensure_ascii=False) + "\n").encode("utf-8"))
+    socket.waitForBytesWritten(timeout_ms)
+    reply = b""
+    # 导出等命令可能需要一点时间
+    while not reply.endswith(b"\n") and socket.waitForReadyRead(30000):
+        reply += bytes(socket.readAll())
+    socket.disconnectFromServer()
+    try:
+        return json.loads(reply)
+    except ValueError:
+        return {"ok": False, "message": "运行中的实例没有响应"}
+
+
+def exit_with_reply(reply: Optional[dict]):
+    """输出运行中实例的回复并退出"""
+    if reply is None:
+        reply = {"ok": False, "message": "另一个实例正在运行，但无法连接"}
+    if reply.get("message") and sys.stdout is not None:
+        print(reply["message"])
+    sys.exit(0 if reply.get("ok") else 1)
+
+
+if __name__ == "__main__" and not {"-h", "--help"} & set(sys.argv[1:]):
+    # 已有实例在运行：转发命令行后立即退出（帮助信息仍由本进程的 parse_app_args 输出）
+    _reply = forward_to_running_instance(instance_server_name(app_data_file()), sys.argv[1:])
+    if _reply is not None:
+        exit_with_reply(_reply)
+
 from PyQt6.QtWidgets import (
     QApplication,
     QWidget,
@@ -12,8 +75,9 @@ from PyQt6.QtWidgets import (
     QHBoxLayout,
     QLineEdit,
     QPushButton,
-    QListWidget,
-    QListWidgetItem,
+    QListView,
+    QStyledItemDelegate,
+    QStyle,
     QLabel,
     QFileDialog,
     QMessageBox,
@@ -23,10 +87,32 @@ from PyQt6.QtWidgets import (
     QToolButton,
     QSystemTrayIcon,
     QMenu,
+    QComboBox,
+    QCheckBox,
+    QDateEdit,
+    QProgressDialog,
+)
+from PyQt6.QtCore import (
+    Qt,
+    QTimer,
+    QDate,
+    QPoint,
+    QSize,
+    QSettings,
+    QMimeData,
+    QByteArray,
+    QAbstractListModel,
+    QModelIndex,
+    QItemSelection,
+    QItemSelectionModel,
+    QThread,
+    QObject,
+    QFileSystemWatcher,
+    pyqtSignal,
 )
-from PyQt6.QtCore import Qt, QTimer, QDate, QPoint, QSettings, QMimeData
 from PyQt6.QtGui import (
     QFont,
+    QFontMetrics,
     QDrag,
     QColor,
     QIcon,
@@ -34,8 +120,254 @@ from PyQt6.QtGui import (
     QPixmap,
     QPainter,
     QPen,  # 添加 QPen 导入
+    QShortcut,
+    QKeySequence,
 )
 
+# 任务数据、持久化、归档、导入导出和搜索都在不依赖 Qt 的 task_core 中，界面只是其上的一层
+from task_core import (
+    TaskItem,
+    reorder_moves,
+    invert_record,
+    rebase_records,
+    UndoHistory,
+    JsonStorage,
+    STORAGE_BACKENDS,
+    open_storage,
+    StateWriter,
+    TaskArchive,
+    select_tasks_to_archive,
+    EXPORT_FORMATS,
+    ExportFilter,
+    iter_export_rows,
+    write_export,
+    IMPORT_COLUMNS,
+    validate_import_row,
+    iter_import_rows,
+    SearchIndex,
+    TaskQuery,
+    QueryError,
+    QUERY_HELP,
+    archive_path,
+    archive_cutoff,
+    group_state_tasks,
+    QUADRANT_NAMES,
+    DEFAULT_QUADRANT,
+)
+
+# --- 0. 主题：样式表、字体、颜色集中构建并共享 ---
+class Theme:
+    """
+    界面样式集中在这里构建一次并共享：固定样式表为类常量，
+    随设置变化的样式由带缓存的函数生成（相同参数直接复用）。
+    set_style / set_point_size 只在内容真正变化时才更新控件，避免无谓的重新 polish。
+    """
+
+    MAIN_FRAME_STYLE = """
+        QFrame#MainFrame {
+            background-color: rgba(37, 52, 57, 230); /* 85% 不透明度 */
+            border-radius: 10px;
+            border: 1px solid rgba(255, 255, 255, 10);
+        }
+    """
+
+    # 四个象限列表共用
+    LIST_STYLE = """
+        /* 列表整体样式 */
+        QListView { 
+            background: transparent; 
+            border: none; 
+            outline: none;
+            color: white;
+            /* 添加内边距给滚动条留空间 */
+            padding-right: 4px;
+        }
+        
+        /* 垂直滚动条样式 - 更现代、半透明的设计 */
+        QScrollBar:vertical {
+            background-color: transparent;
+            width: 10px;
+            margin: 0px;
+            border-radius: 5px;
+        }
+        
+        QScrollBar::handle:vertical {
+            background-color: rgba(255, 255, 255, 0.3);
+            border-radius: 5px;
+            min-height: 30px;
+        }
+        
+        QScrollBar::handle:vertical:hover {
+            background-color: rgba(255, 255, 255, 0.5);
+        }
+        
+        QScrollBar::handle:vertical:pressed {
+            background-color: rgba(255, 255, 255, 0.7);
+        }
+        
+        QScrollBar::add-line:vertical, 
+        QScrollBar::sub-line:vertical {
+            background: none;
+            height: 0px;
+        }
+        
+        QScrollBar::add-page:vertical, 
+        QScrollBar::sub-page:vertical {
+            background: none;
+        }
+        
+        /* 水平滚动条样式 (通常不需要，但以防万一) */
+        QScrollBar:horizontal {
+            background-color: transparent;
+            height: 10px;
+            margin: 0px;
+            border-radius: 5px;
+        }
+        
+        QScrollBar::handle:horizontal {
+            background-color: rgba(255, 255, 255, 0.3);
+            border-radius: 5px;
+            min-width: 30px;
+        }
+        
+        QScrollBar::handle:horizontal:hover {
+            background-color: rgba(255, 255, 255, 0.5);
+        }
+    """
+
+    MENU_STYLE = """
+        QMenu { background-color: #34495e; color: white; border: 1px solid #555; border-radius: 5px; }
+        QMenu::item { padding: 5px 25px; }
+        QMenu::item:selected { background-color: #2980b9; }
+        QMenu::item:disabled { color: #7f8c8d; }
+    """
+
+    CALENDAR_STYLE = """
+        /* --- 整体结构 --- */
+        QCalendarWidget {
+            background-color: #2c3e50; /* 整体深色背景 */
+            border: 1px solid rgba(255,255,255,0.1);
+            border-radius: 8px;
+        }
+        
+        /* --- 顶部导航栏区域 (修复月份看不清的问题) --- */
+        /* 导航栏背景 */
+        QWidget#qt_calendar_navigationbar {
+            background-color: #2c3e50;
+            border-top-left-radius: 8px;
+            border-top-right-radius: 8px;
+            padding: 5px;
+        }
+        /* 导航栏里的文字标签（显示月份和年份的文本）强制白色 */
+        QWidget#qt_calendar_navigationbar QLabel {
+            color: white;
+            font-size: 16px;
+            font-weight: bold;
+        }
+
+        /* --- 修复箭头按钮样式 --- */
+        /* 针对我们刚才修改了文本的两个特定按钮 */
+        QToolButton#qt_calendar_prevmonth, QToolButton#qt_calendar_nextmonth {
+            color: rgba(255,255,255,0.6); /* 平时稍微透明 */
+            background-color: transparent;
+            border: none;
+            font-size: 18px;
+            font-weight: bold;
+            padding: 5px;
+        }
+        QToolButton#qt_calendar_prevmonth:hover, QToolButton#qt_calendar_nextmonth:hover {
+            color: white; /* 悬停变亮 */
+            background-color: rgba(255,255,255,0.1);
+            border-radius: 4px;
+        }
+
+        /* --- 修复年份下拉框 (修复图4看不清的问题) --- */
+        QCalendarWidget QSpinBox {
+            color: white;
+            background-color: rgba(255,255,255,0.1);
+            selection-background-color: #1abc9c;
+            selection-color: white;
+            border-radius: 4px;
+            padding-right: 15px; /* 给下拉箭头留位置 */
+        }
+        /* 年份输入框的向上向下小按钮 */
+        QCalendarWidget QSpinBox::up-button, QCalendarWidget QSpinBox::down-button {
+            subcontrol-origin: border;
+            width: 15px;
+            background: transparent; 
+        }
+        /* 下拉出来的列表视图 */
+        QCalendarWidget QAbstractItemView:enabled {
+            background-color: #34495e; /* 下拉列表背景色 */
+            color: white;
+            selection-background-color: #1abc9c;
+        }
+
+        /* --- 日历主体表格区域 (修复红白相间问题) --- */
+        QCalendarWidget QTableView {
+            background-color: transparent;
+            alternate-background-color: transparent;
+            selection-background-color: #1abc9c; /* 选中日期为青色 */
+            selection-color: white;
+            outline: none; /* 去除选中虚线框 */
+        }
+        
+        /* 【关键】强制所有日期格子的文字颜色为白色，覆盖默认的周末红色 */
+        QCalendarWidget QAbstractItemView {
+            color: white;
+            font-size: 14px;
+        }
+        /* 鼠标悬停在日期上 */
+        QCalendarWidget QAbstractItemView:hover {
+            background-color: rgba(255,255,255,0.1);
+            border-radius: 4px;
+        }
+        
+        /* --- 表头 (周一、周二...) --- */
+        QCalendarWidget QHeaderView::section {
+            background-color: transparent;
+            color: rgba(255,255,255,0.5); /* 表头文字稍微暗一点 */
+            border: none;
+            font-weight: bold;
+            padding: 5px;
+        }
+    """
+
+    INPUT_STYLE = "background: rgba(255,255,255,0.08); border: 1px solid rgba(255,255,255,0.1); color: white; padding: 0 10px; border-radius: 8px;"
+    INPUT_ERROR_STYLE = "background: rgba(255,255,255,0.08); border: 1px solid rgba(255,90,90,0.8); color: white; padding: 0 10px; border-radius: 8px;"
+    SMALL_BUTTON_STYLE = "background: rgba(255,255,255,0.12); color: white; border-radius: 8px;"
+
+    COUNTDOWN_COLOR = "white"
+    OVERDUE_COLOR = "#ff7675"
+
+    @staticmethod
+    @functools.lru_cache(maxsize=None)
+    def quadrant_title_style(font_size: int) -> str:
+        return f"color: rgba(255,255,255,0.5); font-size: {font_size}px; font-weight: bold;"
+
+    @staticmethod
+    @functools.lru_cache(maxsize=None)
+    def countdown_style(font_size: int, overdue: bool) -> str:
+        color = Theme.OVERDUE_COLOR if overdue else Theme.COUNTDOWN_COLOR
+        return f"color: {color}; font-size: {font_size}px; font-weight: bold;"
+
+    @staticmethod
+    def set_style(widget, style: str):
+        """样式表没有变化时不重新设置（setStyleSheet 会触发整棵子树重新 polish）"""
+        if widget.styleSheet() != style:
+            widget.setStyleSheet(style)
+
+    @staticmethod
+    def set_point_size(widget, point_size: int) -> bool:
+        """字号没有变化时不重新设置字体，返回是否有变化"""
+        font = widget.font()
+        if font.pointSize() == point_size:
+            return False
+        font.setPointSize(point_size)
+        widget.setFont(font)
+        return True
+
+
 # --- 1. 自定义日历弹窗 (修复星期显示问题) ---
 class CalendarPopup(QDialog):
     def __init__(self, parent=None, current_date=QDate.currentDate()):
@@ -70,268 +402,482 @@ class CalendarPopup(QDialog):
             next_btn.setCursor(Qt.CursorShape.PointingHandCursor)
 
         # --- 【核心修改 2 & 3：深度定制样式表】 ---
-        self.cal.setStyleSheet("""
-            /* --- 整体结构 --- */
-            QCalendarWidget {
-                background-color: #2c3e50; /* 整体深色背景 */
-                border: 1px solid rgba(255,255,255,0.1);
-                border-radius: 8px;
-            }
-            
-            /* --- 顶部导航栏区域 (修复月份看不清的问题) --- */
-            /* 导航栏背景 */
-            QWidget#qt_calendar_navigationbar {
-                background-color: #2c3e50;
-                border-top-left-radius: 8px;
-                border-top-right-radius: 8px;
-                padding: 5px;
-            }
-            /* 导航栏里的文字标签（显示月份和年份的文本）强制白色 */
-            QWidget#qt_calendar_navigationbar QLabel {
-                color: white;
-                font-size: 16px;
-                font-weight: bold;
-            }
-
-            /* --- 修复箭头按钮样式 --- */
-            /* 针对我们刚才修改了文本的两个特定按钮 */
-            QToolButton#qt_calendar_prevmonth, QToolButton#qt_calendar_nextmonth {
-                color: rgba(255,255,255,0.6); /* 平时稍微透明 */
-                background-color: transparent;
-                border: none;
-                font-size: 18px;
-                font-weight: bold;
-                padding: 5px;
-            }
-            QToolButton#qt_calendar_prevmonth:hover, QToolButton#qt_calendar_nextmonth:hover {
-                color: white; /* 悬停变亮 */
-                background-color: rgba(255,255,255,0.1);
-                border-radius: 4px;
-            }
-
-            /* --- 修复年份下拉框 (修复图4看不清的问题) --- */
-            QCalendarWidget QSpinBox {
-                color: white;
-                background-color: rgba(255,255,255,0.1);
-                selection-background-color: #1abc9c;
-                selection-color: white;
-                border-radius: 4px;
-                padding-right: 15px; /* 给下拉箭头留位置 */
-            }
-            /* 年份输入框的向上向下小按钮 */
-            QCalendarWidget QSpinBox::up-button, QCalendarWidget QSpinBox::down-button {
-                subcontrol-origin: border;
-                width: 15px;
-                background: transparent; 
-            }
-            /* 下拉出来的列表视图 */
-            QCalendarWidget QAbstractItemView:enabled {
-                background-color: #34495e; /* 下拉列表背景色 */
-                color: white;
-                selection-background-color: #1abc9c;
-            }
-
-            /* --- 日历主体表格区域 (修复红白相间问题) --- */
-            QCalendarWidget QTableView {
-                background-color: transparent;
-                alternate-background-color: transparent;
-                selection-background-color: #1abc9c; /* 选中日期为青色 */
-                selection-color: white;
-                outline: none; /* 去除选中虚线框 */
-            }
-            
-            /* 【关键】强制所有日期格子的文字颜色为白色，覆盖默认的周末红色 */
-            QCalendarWidget QAbstractItemView {
-                color: white;
-                font-size: 14px;
-            }
-            /* 鼠标悬停在日期上 */
-            QCalendarWidget QAbstractItemView:hover {
-                background-color: rgba(255,255,255,0.1);
-                border-radius: 4px;
-            }
-            
-            /* --- 表头 (周一、周二...) --- */
-            QCalendarWidget QHeaderView::section {
-                background-color: transparent;
-                color: rgba(255,255,255,0.5); /* 表头文字稍微暗一点 */
-                border: none;
-                font-weight: bold;
-                padding: 5px;
-            }
-        """)
+        self.cal.setStyleSheet(Theme.CALENDAR_STYLE)
         
         layout.addWidget(self.cal)
 
+    def set_date(self, date):
+        self.selected_date = date
+        self.cal.setSelectedDate(date)
+
     def save_date(self, date):
         self.selected_date = date
         self.accept()
 
 # --- 2. 任务项逻辑 ---
-class TaskItem(QListWidgetItem):
-    def __init__(
-        self,
-        text: str,
-        created_at: Optional[str] = None,
-        finished_at: str = "未完成",
-        is_done: bool = False,
-    ):
-        super().__init__(text)
-        # 真实内容单独保存，方便显示时加前缀符号（✓ 等）
-        self.content = text
-        # 如果是从历史记录恢复，则使用传入时间；否则使用当前时间
-        self.created_at = created_at or datetime.now().strftime("%Y-%m-%d %H:%M")
-        self.finished_at = finished_at
-        self.is_done = is_done
-        self.update_appearance()
-
-    def toggle_status(self):
-        self.is_done = not self.is_done
-        self.finished_at = datetime.now().strftime("%Y-%m-%d %H:%M") if self.is_done else "未完成"
-        self.update_appearance()
-
-    def update_appearance(self):
-        """根据完成状态更新显示样式"""
-        # 文本（显示时为内容前加符号，真实内容保存在 self.content）
-        display_text = self.content
-        if self.is_done:
-            display_text = f"{self.content}"
-        self.setText(display_text)
-
-        # 字体样式：完成后加删除线、稍微变细一点
-        font = self.font()
-        font.setStrikeOut(self.is_done)
-        self.setFont(font)
-
-        # 颜色与背景：完成后显著变灰并加半透明底色
-        if self.is_done:
-            self.setForeground(QColor(200, 200, 200, 130))
-            self.setBackground(QColor(0, 0, 0, 80))
+class TaskIndex:
+    """
+    全局任务索引：任务 ID -> 所在的象限模型，四个象限共用。
+    行号由各象限模型在插入 / 移动 / 删除时维护（QuadrantModel.row_of），
+    两者结合即可 O(1) 定位任务的 (象限, 行)。
+    """
+
+    def __init__(self):
+        self._models = {}
+
+    def __len__(self) -> int:
+        return len(self._models)
+
+    def __contains__(self, task_id: str) -> bool:
+        return task_id in self._models
+
+    def add(self, model, tasks):
+        for task in tasks:
+            self._models[task.id] = model
+
+    def remove(self, model, tasks):
+        """移除仍登记在 model 下的任务（任务已被移到其他象限时保留新的登记）"""
+        models = self._models
+        for task in tasks:
+            if models.get(task.id) is model:
+                del models[task.id]
+
+    def locate(self, task_id: str) -> Optional[tuple]:
+        """返回 (象限名, 存储行)，不存在时返回 None"""
+        model = self._models.get(task_id)
+        if model is None:
+            return None
+        return model.quadrant, model.row_of(task_id)
+
+    def task(self, task_id: str) -> Optional[TaskItem]:
+        model = self._models.get(task_id)
+        if model is None:
+            return None
+        return model.task(model.row_of(task_id))
+
+
+class QuadrantModel(QAbstractListModel):
+    """
+    单个象限的任务列表模型，视图只为可见行取数据。
+    tasks 为完整的任务顺序（"存储行"）；设置了搜索筛选时，视图只显示匹配的任务（"视图行"），
+    所有修改接口都使用存储行，视图行通过 store_row() 转换。
+    """
+
+    TaskRole = Qt.ItemDataRole.UserRole + 1
+
+    def __init__(self, parent=None, search_index=None, task_index=None, quadrant: str = ""):
+        super().__init__(parent)
+        self.quadrant = quadrant
+        self.tasks = []
+        self.search_index = search_index
+        self.task_index = task_index
+        self._row_of = {}  # 任务 ID -> 存储行
+        self._matches = None  # 当前筛选命中的任务（四个象限共用）；None 表示不筛选
+        self._visible = None  # 筛选后可见的任务（保持存储顺序）
+        self._view_row_of = None  # 筛选时：任务 ID -> 视图行
+
+    def _rows(self) -> list:
+        return self.tasks if self._visible is None else self._visible
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows())
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        task = self._rows()[index.row()]
+        if role == Qt.ItemDataRole.DisplayRole:
+            return task.content
+        if role == Qt.ItemDataRole.ToolTipRole:
+            return task.tooltip()
+        if role == self.TaskRole:
+            return task
+        return None
+
+    def flags(self, index):
+        if not index.isValid():
+            return Qt.ItemFlag.ItemIsDropEnabled
+        return (
+            Qt.ItemFlag.ItemIsEnabled
+            | Qt.ItemFlag.ItemIsSelectable
+            | Qt.ItemFlag.ItemIsDragEnabled
+        )
+
+    def supportedDropActions(self):
+        return Qt.DropAction.MoveAction
+
+    def task(self, row: int) -> TaskItem:
+        """按存储行取任务"""
+        return self.tasks[row]
+
+    def row_of(self, task_id: str) -> int:
+        """按任务 ID 取当前存储行（O(1)），不在本象限时返回 -1"""
+        return self._row_of.get(task_id, -1)
+
+    def _index_from(self, start: int = 0):
+        """重建 start 及之后各任务的 ID -> 行 映射（插入/删除/移动后只更新受影响的部分）"""
+        if start == 0:
+            self._row_of = {}
+        self._row_of.update(
+            (task.id, row) for row, task in enumerate(self.tasks[start:], start)
+        )
+
+    def _update_visible(self):
+        """按当前筛选重建可见任务列表和 ID -> 视图行 映射"""
+        if self._matches is None:
+            self._visible = None
+            self._view_row_of = None
         else:
-            self.setForeground(QColor(255, 255, 255))
-            self.setBackground(QColor(0, 0, 0, 0))
+            matches = self._matches
+            if isinstance(matches, (set, frozenset)) and len(matches) >= len(self.tasks):
+                # 命中的任务不少于本象限的任务数：按存储顺序过一遍本象限更快
+                self._visible = [t for t in self.tasks if t in matches]
+            else:
+                # 只按命中的任务取行号排序，不扫描整个象限
+                row_of = self._row_of
+                rows = sorted(row_of[t.id] for t in matches if t.id in row_of)
+                self._visible = [self.tasks[row] for row in rows]
+            self._view_row_of = {t.id: row for row, t in enumerate(self._visible)}
+
+    def _add_to_indexes(self, tasks: list):
+        if self.search_index is not None:
+            self.search_index.add_many(tasks)
+        if self.task_index is not None:
+            self.task_index.add(self, tasks)
+
+    def _remove_from_indexes(self, tasks: list):
+        if self.search_index is not None:
+            self.search_index.remove_many(tasks)
+        if self.task_index is not None:
+            self.task_index.remove(self, tasks)
+
+    def store_row(self, view_row: int) -> int:
+        """视图行 -> 存储行"""
+        if self._visible is None:
+            return view_row
+        return self._row_of[self._visible[view_row].id]
+
+    def view_row(self, row: int) -> int:
+        """存储行 -> 视图行；被筛选隐藏时返回 -1"""
+        if self._visible is None:
+            return row
+        return self._view_row_of.get(self.tasks[row].id, -1)
+
+    def visible_rows(self) -> list:
+        """当前可见任务的存储行（升序）"""
+        if self._visible is None:
+            return list(range(len(self.tasks)))
+        return [self._row_of[t.id] for t in self._visible]
+
+    def set_filter(self, matches):
+        """只显示 matches（任务集合或列表，可以包含其他象限的任务）中的任务；传入 None 取消筛选"""
+        self.beginResetModel()
+        self._matches = matches
+        self._update_visible()
+        self.endResetModel()
+
+    def _refilter(self):
+        self.set_filter(self._matches)
+
+    def insert_task(self, row: int, task: TaskItem):
+        self.insert_tasks(row, [task])
+
+    def insert_tasks(self, row: int, tasks: list):
+        """一次插入多条任务（只发一次行插入通知）"""
+        if not tasks:
+            return
+        self._add_to_indexes(tasks)
+        if self._visible is not None:
+            self.tasks[row:row] = tasks
+            self._index_from(row)
+            self._refilter()
+            return
+        self.beginInsertRows(QModelIndex(), row, row + len(tasks) - 1)
+        self.tasks[row:row] = tasks
+        self._index_from(row)
+        self.endInsertRows()
+
+    def take_task(self, row: int) -> TaskItem:
+        if self._visible is not None:
+            task = self.tasks.pop(row)
+            del self._row_of[task.id]
+            self._index_from(row)
+            self._refilter()
+        else:
+            self.beginRemoveRows(QModelIndex(), row, row)
+            task = self.tasks.pop(row)
+            del self._row_of[task.id]
+            self._index_from(row)
+            self.endRemoveRows()
+        self._remove_from_indexes([task])
+        return task
+
+    def remove_tasks(self, rows: list) -> list:
+        """一次移除多行任务（只触发一次模型重置），返回被移除的任务"""
+        row_set = set(rows)
+        removed = [self.tasks[i] for i in sorted(row_set)]
+        self.beginResetModel()
+        self.tasks = [t for i, t in enumerate(self.tasks) if i not in row_set]
+        self._index_from(0)
+        self._update_visible()
+        self.endResetModel()
+        self._remove_from_indexes(removed)
+        return removed
+
+    def move_task(self, row: int, target_row: int):
+        """在列表内把 row 移到 target_row（target_row 为移动后的位置）"""
+        if row == target_row:
+            return
+        if self._visible is not None:
+            self.tasks.insert(target_row, self.tasks.pop(row))
+            self._index_from(min(row, target_row))
+            self._refilter()
+            return
+        # beginMoveRows 的目标位置是移动前的插入点
+        dest = target_row + 1 if target_row > row else target_row
+        self.beginMoveRows(QModelIndex(), row, row, QModelIndex(), dest)
+        self.tasks.insert(target_row, self.tasks.pop(row))
+        self._index_from(min(row, target_row))
+        self.endMoveRows()
+
+    def reorder(self, tasks: list):
+        """按新的存储顺序整体重排（任务集合不变，只触发一次模型重置）"""
+        self.beginResetModel()
+        self.tasks = list(tasks)
+        self._index_from(0)
+        self._update_visible()
+        self.endResetModel()
+
+    def task_changed(self, row: int):
+        if self.search_index is not None:
+            self.search_index.update_fields(self.tasks[row])
+        row = self.view_row(row)
+        if row >= 0:
+            index = self.index(row)
+            self.dataChanged.emit(index, index)
+
+    def tasks_changed(self, rows: list):
+        """多行任务变化，只发一次 dataChanged（覆盖最小到最大的视图行）"""
+        if self.search_index is not None:
+            for row in rows:
+                self.search_index.update_fields(self.tasks[row])
+        view_rows = [r for r in map(self.view_row, rows) if r >= 0]
+        if view_rows:
+            self.dataChanged.emit(self.index(min(view_rows)), self.index(max(view_rows)))
+
+    def set_tasks(self, tasks: list):
+        """整批替换全部任务（只触发一次模型重置，用于加载）"""
+        self._remove_from_indexes(self.tasks)
+        self._add_to_indexes(tasks)
+        self.beginResetModel()
+        self.tasks = list(tasks)
+        self._index_from(0)
+        self._update_visible()
+        self.endResetModel()
+
+    def clear(self):
+        self.set_tasks([])
+
+
+class TaskDelegate(QStyledItemDelegate):
+    """
+    绘制时才计算任务样式：完成后加删除线、变灰并加半透明底色。
+    所有行等高（row_height 由列表按任务字体设置），视图只需为可见行调用 paint。
+    """
+
+    MIN_ROW_HEIGHT = 24  # 最小行高，避免太小
+    ELIDE_CACHE_SIZE = 4096  # 省略号文本缓存的条数上限
+    TEXT_COLOR = QColor(255, 255, 255)
+    DONE_TEXT_COLOR = QColor(200, 200, 200, 130)
+    DONE_BACKGROUND = QColor(0, 0, 0, 80)
+    HOVER_BACKGROUND = QColor(255, 255, 255, 20)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.row_height = self.MIN_ROW_HEIGHT
+        self._font_key = None
+        self._fonts = None  # (普通字体, 删除线字体, 字体度量)，字体不变时复用
+        self._elide_width = None
+        self._elided = {}  # 任务内容 -> 截断后的显示文本（字体或宽度变化时清空）
+
+    def _fonts_for(self, font: QFont) -> tuple:
+        key = font.key()
+        if key != self._font_key:
+            strike = QFont(font)
+            strike.setStrikeOut(True)
+            self._font_key = key
+            self._fonts = (QFont(font), strike, QFontMetrics(font))
+            self._elided.clear()
+        return self._fonts
+
+    def _elided_text(self, metrics: QFontMetrics, text: str, width: int) -> str:
+        if width != self._elide_width:
+            self._elide_width = width
+            self._elided.clear()
+        elided = self._elided.get(text)
+        if elided is None:
+            if len(self._elided) >= self.ELIDE_CACHE_SIZE:
+                self._elided.clear()
+            elided = self._elided[text] = metrics.elidedText(text, Qt.TextElideMode.ElideRight, width)
+        return elided
+
+    def paint(self, painter, option, index):
+        task = index.data(QuadrantModel.TaskRole)
+        if task is None:
+            super().paint(painter, option, index)
+            return
+
+        painter.save()
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        painter.setPen(Qt.PenStyle.NoPen)
+        rect = option.rect
+        if task.is_done:
+            painter.setBrush(self.DONE_BACKGROUND)
+            painter.drawRoundedRect(rect, 2, 2)
+        if option.state & QStyle.StateFlag.State_MouseOver:
+            painter.setBrush(self.HOVER_BACKGROUND)
+            painter.drawRoundedRect(rect, 2, 2)
+
+        normal_font, strike_font, metrics = self._fonts_for(option.font)
+        painter.setFont(strike_font if task.is_done else normal_font)
+        painter.setPen(self.DONE_TEXT_COLOR if task.is_done else self.TEXT_COLOR)
+        text_rect = rect.adjusted(4, 0, -4, 0)
+        text = self._elided_text(metrics, task.content, text_rect.width())
+        painter.drawText(
+            text_rect,
+            Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignVCenter,
+            text,
+        )
+        painter.restore()
 
-        # 悬停提示：显示任务状态和时间信息
-        status_text = "已完成" if self.is_done else "未完成"
-        tooltip = f"内容：{self.content}\n状态：{status_text}\n创建时间：{self.created_at}"
-        if self.is_done and self.finished_at:
-            tooltip += f"\n完成时间：{self.finished_at}"
-        self.setToolTip(tooltip)
+    def sizeHint(self, option, index):
+        return QSize(option.rect.width(), self.row_height)
 
 # --- 3. 列表控件 ---
+class TaskMimeData(QMimeData):
+    """
+    进程内拖拽数据：直接引用来源列表和任务对象（可多选），放下时按任务 ID 定位并移动原有记录，不做序列化。
+    文本 / JSON 只在拖到其他程序、对方真正读取时才按需生成
+    """
+    JSON_MIME_TYPE = "application/json"
+
+    def __init__(self, source_list, tasks: list):
+        super().__init__()
+        self.source_list = source_list
+        self.tasks = tasks
+
+    def formats(self):
+        return [QuadrantList.TASK_MIME_TYPE, self.JSON_MIME_TYPE, "text/plain"]
+
+    def hasFormat(self, mime_type):
+        return mime_type in self.formats()
+
+    def retrieveData(self, mime_type, preferred_type):
+        if mime_type == "text/plain":
+            return "\n".join(task.content for task in self.tasks)
+        if mime_type == self.JSON_MIME_TYPE:
+            quadrant = self.source_list.quadrant_name
+            data = [dict(task.to_dict(), quadrant=quadrant) for task in self.tasks]
+            return QByteArray(json.dumps(data, ensure_ascii=False).encode("utf-8"))
+        if mime_type == QuadrantList.TASK_MIME_TYPE:
+            return QByteArray(b"task_drag")
+        return None
+
+
 # --- 3. 列表控件 (优化拖拽并新增右键上下移功能) ---
-class QuadrantList(QListWidget):
+class QuadrantList(QListView):
     TASK_MIME_TYPE = "application/x-eisenhower-task"
     
-    def __init__(self, quadrant_name: str):
+    def __init__(self, quadrant_name: str, search_index=None, task_index=None):
         super().__init__()
         self.quadrant_name = quadrant_name
+        self.task_model = QuadrantModel(self, search_index, task_index, quadrant_name)
+        self.setModel(self.task_model)
+        self.task_delegate = TaskDelegate(self)
+        self.setItemDelegate(self.task_delegate)
+        # 行高固定：视图只取一次尺寸，滚动和缩放只处理可见行；布局分批进行，不阻塞界面
+        self.setUniformItemSizes(True)
+        self.setLayoutMode(QListView.LayoutMode.Batched)
+        self.setBatchSize(500)
+        self.set_task_font_size(self.font().pointSize())
+        self.setMouseTracking(True)  # 悬停高亮
         self.setAcceptDrops(True)
         self.setDragEnabled(True)
-        self.setSelectionMode(QListWidget.SelectionMode.SingleSelection)
+        # Ctrl / Shift 多选，批量拖拽、勾选、删除、排序
+        self.setSelectionMode(QListView.SelectionMode.ExtendedSelection)
         self.setDefaultDropAction(Qt.DropAction.MoveAction)
         self.setSpacing(1)
         self.setVerticalScrollMode(self.ScrollMode.ScrollPerPixel)
         self.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
         self.customContextMenuRequested.connect(self.show_context_menu)
 
-        # 样式代码保持不变...
-        # 设置样式
-        self.setStyleSheet("""
-            /* 列表整体样式 */
-            QListWidget { 
-                background: transparent; 
-                border: none; 
-                outline: none;
-                /* 添加内边距给滚动条留空间 */
-                padding-right: 4px;
-            }
-            
-            /* 列表项样式 */
-            QListWidget::item { 
-                color: white; 
-                padding: 2px; 
-                background: transparent;
-                border-radius: 2px;
-                margin: 0px;
-                min-height: 24px;  /* 设置最小高度，避免太小 */
-            }
-            
-            QListWidget::item:selected { 
-                background: transparent; 
-                border: none; 
-            }
-            
-            QListWidget::item:hover {
-                background-color: rgba(255, 255, 255, 0.08);
-            }
-            
-            /* 垂直滚动条样式 - 更现代、半透明的设计 */
-            QScrollBar:vertical {
-                background-color: transparent;
-                width: 10px;
-                margin: 0px;
-                border-radius: 5px;
-            }
-            
-            QScrollBar::handle:vertical {
-                background-color: rgba(255, 255, 255, 0.3);
-                border-radius: 5px;
-                min-height: 30px;
-            }
-            
-            QScrollBar::handle:vertical:hover {
-                background-color: rgba(255, 255, 255, 0.5);
-            }
-            
-            QScrollBar::handle:vertical:pressed {
-                background-color: rgba(255, 255, 255, 0.7);
-            }
-            
-            QScrollBar::add-line:vertical, 
-            QScrollBar::sub-line:vertical {
-                background: none;
-                height: 0px;
-            }
-            
-            QScrollBar::add-page:vertical, 
-            QScrollBar::sub-page:vertical {
-                background: none;
-            }
-            
-            /* 水平滚动条样式 (通常不需要，但以防万一) */
-            QScrollBar:horizontal {
-                background-color: transparent;
-                height: 10px;
-                margin: 0px;
-                border-radius: 5px;
-            }
-            
-            QScrollBar::handle:horizontal {
-                background-color: rgba(255, 255, 255, 0.3);
-                border-radius: 5px;
-                min-width: 30px;
-            }
-            
-            QScrollBar::handle:horizontal:hover {
-                background-color: rgba(255, 255, 255, 0.5);
-            }
-        """)
+        # 设置样式（共用同一份样式表，任务项由 TaskDelegate 绘制）
+        self.setStyleSheet(Theme.LIST_STYLE)
+
+    def set_task_font_size(self, point_size: int):
+        """设置任务字体，并按字体高度固定行高（字号未变时什么都不做）"""
+        Theme.set_point_size(self, point_size)
+        row_height = max(TaskDelegate.MIN_ROW_HEIGHT, QFontMetrics(self.font()).height() + 4)
+        if row_height != self.task_delegate.row_height:
+            self.task_delegate.row_height = row_height
+            self.scheduleDelayedItemsLayout()
+
+    def count(self) -> int:
+        """任务总数（含被搜索筛选隐藏的任务）"""
+        return len(self.task_model.tasks)
+
+    def task(self, row: int) -> TaskItem:
+        """按存储行取任务"""
+        return self.task_model.task(row)
+
+    def select_row(self, row: int):
+        """选中存储行对应的任务（被筛选隐藏时不选中）"""
+        view_row = self.task_model.view_row(row)
+        if view_row >= 0:
+            self.setCurrentIndex(self.task_model.index(view_row))
+
+    def select_rows(self, rows: list):
+        """选中多个存储行对应的任务"""
+        selection = QItemSelection()
+        for row in rows:
+            view_row = self.task_model.view_row(row)
+            if view_row >= 0:
+                index = self.task_model.index(view_row)
+                selection.select(index, index)
+        self.selectionModel().select(selection, QItemSelectionModel.SelectionFlag.ClearAndSelect)
+
+    def selected_rows(self) -> list:
+        """当前选中任务的存储行（升序）"""
+        model = self.task_model
+        return sorted(model.store_row(index.row()) for index in self.selectedIndexes())
+
+    def record_batch(self, records: list):
+        """把一次批量操作的改动作为一条记录提交（一次事务、一次落盘）"""
+        if not records or not hasattr(self.window(), "record_change"):
+            return
+        if len(records) == 1:
+            self.window().record_change(records[0])
+        else:
+            self.window().record_change({"op": "batch", "records": records})
+
+    def keyPressEvent(self, event):
+        if event.key() == Qt.Key.Key_Delete and self.selectedIndexes():
+            self.delete_rows(self.selected_rows())
+            return
+        super().keyPressEvent(event)
 
     def show_context_menu(self, pos):
-        """显示右键菜单：删除、上移、下移"""
-        item = self.itemAt(pos)
-        if not item:
+        """显示右键菜单：删除、上移、下移；右键点在多选范围内时对所有选中任务批量操作"""
+        index = self.indexAt(pos)
+        if not index.isValid():
             return
 
-        curr_row = self.row(item)
+        curr_row = index.row()
+        if self.selectionModel().isSelected(index) and len(self.selectedIndexes()) > 1:
+            self.show_batch_menu(pos)
+            return
         menu = QMenu(self)
-        menu.setStyleSheet("""
-            QMenu { background-color: #34495e; color: white; border: 1px solid #555; border-radius: 5px; }
-            QMenu::item { padding: 5px 25px; }
-            QMenu::item:selected { background-color: #2980b9; }
-            QMenu::item:disabled { color: #7f8c8d; }
-        """)
+        menu.setStyleSheet(Theme.MENU_STYLE)
         
         # --- 菜单项：上移 ---
         move_up_action = QAction("🔼 上移任务", self)
@@ -340,12 +886,12 @@ class QuadrantList(QListWidget):
         
         # --- 菜单项：下移 ---
         move_down_action = QAction("🔽 下移任务", self)
-        move_down_action.setEnabled(curr_row < self.count() - 1)
+        move_down_action.setEnabled(curr_row < self.task_model.rowCount() - 1)
         move_down_action.triggered.connect(lambda: self.move_task_offset(curr_row, 1))
         
         # --- 菜单项：删除 ---
         delete_action = QAction("🗑️ 删除任务", self)
-        delete_action.triggered.connect(lambda: self.delete_task(item))
+        delete_action.triggered.connect(lambda: self.delete_task(curr_row))
         
         menu.addAction(move_up_action)
         menu.addAction(move_down_action)
@@ -354,99 +900,428 @@ class QuadrantList(QListWidget):
         
         menu.exec(self.mapToGlobal(pos))
 
-    def move_task_offset(self, row, offset):
-        """处理任务在当前列表内的顺序移动"""
-        target_row = row + offset
-        item = self.takeItem(row)
-        self.insertItem(target_row, item)
-        self.setCurrentRow(target_row)
-        if hasattr(self.window(), "save_state"):
-            self.window().save_state()
-
-    def delete_task(self, item):
-        row = self.row(item)
-        if row >= 0:
-            self.takeItem(row)
-            if hasattr(self.window(), "save_state"):
-                self.window().save_state()
+    def show_batch_menu(self, pos):
+        """多选时的右键菜单：批量完成、上移、下移、删除"""
+        rows = self.selected_rows()
+        view_rows = sorted(index.row() for index in self.selectedIndexes())
+        menu = QMenu(self)
+        menu.setStyleSheet(Theme.MENU_STYLE)
+        all_done = all(self.task(row).is_done for row in rows)
+        toggle_action = QAction(f"{'↩️ 取消完成' if all_done else '✅ 标记完成'}（{len(rows)} 项）", self)
+        toggle_action.triggered.connect(lambda: self.toggle_rows(rows))
+
+        move_up_action = QAction("🔼 上移所选", self)
+        move_up_action.setEnabled(view_rows[0] > 0 or view_rows != list(range(len(view_rows))))
+        move_up_action.triggered.connect(lambda: self.move_rows_offset(view_rows, -1))
+
+        last = self.task_model.rowCount() - 1
+        move_down_action = QAction("🔽 下移所选", self)
+        move_down_action.setEnabled(view_rows != list(range(last - len(view_rows) + 1, last + 1)))
+        move_down_action.triggered.connect(lambda: self.move_rows_offset(view_rows, 1))
+
+        delete_action = QAction(f"🗑️ 删除所选（{len(rows)} 项）", self)
+        delete_action.triggered.connect(lambda: self.delete_rows(rows))
+
+        menu.addAction(toggle_action)
+        menu.addAction(move_up_action)
+        menu.addAction(move_down_action)
+        menu.addSeparator()
+        menu.addAction(delete_action)
+
+        menu.exec(self.mapToGlobal(pos))
+
+    def toggle_rows(self, rows: list):
+        """批量切换完成状态：有未完成的就全部标记完成，否则全部取消完成"""
+        tasks = [self.task(row) for row in rows]
+        target = not all(task.is_done for task in tasks)
+        changed = [row for row, task in zip(rows, tasks) if task.is_done != target]
+        records = []
+        for row in changed:
+            task = self.task(row)
+            old = {"is_done": task.is_done, "finished_at": task.finished_at}
+            task.toggle_status()
+            records.append({
+                "op": "update", "q": self.quadrant_name, "row": row, "id": task.id,
+                "fields": {"is_done": task.is_done, "finished_at": task.finished_at},
+                "old": old,
+            })
+        self.task_model.tasks_changed(changed)
+        self.record_batch(records)
+
+    def delete_rows(self, rows: list):
+        """批量删除（一次模型重置、一条日志记录）"""
+        if not rows:
+            return
+        removed = self.task_model.remove_tasks(rows)
+        # 从后往前删除，重放时前面的行号不受影响；带上任务内容以便撤销
+        self.record_batch([
+            {"op": "delete", "q": self.quadrant_name, "row": row, "id": task.id, "task": task.to_dict()}
+            for row, task in reversed(list(zip(sorted(set(rows)), removed)))
+        ])
+
+    def move_rows_offset(self, view_rows: list, offset: int):
+        """批量上移 / 下移一格：选中的任务与相邻的未选中可见任务交换位置"""
+        model = self.task_model
+        old = list(model.tasks)
+        slots = model.visible_rows()
+        order = [old[row] for row in slots]
+        chosen = {order[view_row] for view_row in view_rows}
+        for view_row in sorted(view_rows, reverse=offset > 0):
+            target = view_row + offset
+            if 0 <= target < len(order) and order[target] not in chosen:
+                order[view_row], order[target] = order[target], order[view_row]
+        # 被筛选隐藏的任务留在原位，只重排可见任务所在的位置
+        new = list(old)
+        for row, task in zip(slots, order):
+            new[row] = task
+        moves = reorder_moves(old, new)
+        if not moves:
+            return
+        model.reorder(new)
+        self.select_rows([row for row, task in enumerate(new) if task in chosen])
+        self.record_batch([
+            {"op": "move", "q": self.quadrant_name, "row": row, "id": task.id,
+             "to_q": self.quadrant_name, "to_row": to_row}
+            for row, to_row, task in moves
+        ])
+
+    def move_task_offset(self, view_row, offset):
+        """处理任务在当前列表内的顺序移动（筛选时与相邻的可见任务交换位置）"""
+        row = self.task_model.store_row(view_row)
+        target_row = self.task_model.store_row(view_row + offset)
+        task = self.task_model.task(row)
+        self.task_model.move_task(row, target_row)
+        self.select_row(target_row)
+        if hasattr(self.window(), "record_change"):
+            self.window().record_change({
+                "op": "move", "q": self.quadrant_name, "row": row, "id": task.id,
+                "to_q": self.quadrant_name, "to_row": target_row,
+            })
+
+    def delete_task(self, view_row):
+        if 0 <= view_row < self.task_model.rowCount():
+            row = self.task_model.store_row(view_row)
+            task = self.task_model.take_task(row)
+            if hasattr(self.window(), "record_change"):
+                self.window().record_change({
+                    "op": "delete", "q": self.quadrant_name, "row": row, "id": task.id,
+                    "task": task.to_dict(),
+                })
 
     # --- 优化后的拖拽逻辑 ---
     def startDrag(self, supportedActions):
-        item = self.currentItem()
-        if item and isinstance(item, TaskItem):
-            mime_data = QMimeData()
-            # 将任务完整数据和来源信息序列化
-            task_data = {
-                'content': item.content,
-                'created_at': item.created_at,
-                'finished_at': item.finished_at,
-                'is_done': item.is_done,
-                'source_quadrant': self.quadrant_name,
-                'source_row': self.row(item)
-            }
-            mime_data.setText(json.dumps(task_data))
-            mime_data.setData(self.TASK_MIME_TYPE, b'task_drag')
-            
+        rows = self.selected_rows()
+        if not rows and self.currentIndex().isValid():
+            rows = [self.task_model.store_row(self.currentIndex().row())]
+        if rows:
+            # 只携带任务对象引用，不序列化
+            mime_data = TaskMimeData(self, [self.task(row) for row in rows])
+
             drag = QDrag(self)
             drag.setMimeData(mime_data)
             # 执行 MoveAction
             drag.exec(Qt.DropAction.MoveAction)
 
     def dragEnterEvent(self, event):
-        if event.mimeData().hasFormat(self.TASK_MIME_TYPE):
+        # 只接受本进程内发起的任务拖拽
+        if isinstance(event.mimeData(), TaskMimeData):
             event.acceptProposedAction()
 
     def dragMoveEvent(self, event):
-        if event.mimeData().hasFormat(self.TASK_MIME_TYPE):
+        if isinstance(event.mimeData(), TaskMimeData):
             event.acceptProposedAction()
 
     def dropEvent(self, event):
-        if event.mimeData().hasFormat(self.TASK_MIME_TYPE):
+        mime_data = event.mimeData()
+        if isinstance(mime_data, TaskMimeData):
             try:
-                data = json.loads(event.mimeData().text())
-                source_q = data.get('source_quadrant')
-                source_row = data.get('source_row')
-                
-                # 计算插入位置
-                drop_row = self.row(self.itemAt(event.position().toPoint()))
-                if drop_row == -1: drop_row = self.count()
-                
-                # 创建新项
-                new_item = TaskItem(
-                    text=data['content'],
-                    created_at=data['created_at'],
-                    finished_at=data['finished_at'],
-                    is_done=data['is_done']
+                src_list = mime_data.source_list
+                source_q = src_list.quadrant_name
+                # 拖拽期间列表可能已变动，按任务 ID 重新定位来源行
+                located = sorted(
+                    ((src_list.task_model.row_of(task.id), task) for task in mime_data.tasks),
+                    key=lambda pair: pair[0],
                 )
-                
-                # 执行逻辑：先删除旧的，再插入新的
+                located = [(row, src_list.task(row)) for row, _ in located if row >= 0]
+                if not located:
+                    return
+                source_rows = [row for row, _ in located]
+                tasks = [task for _, task in located]
+
+                # 计算插入位置（换算为存储行）
+                drop_row = self.indexAt(event.position().toPoint()).row()
+                if drop_row == -1:
+                    drop_row = self.count()
+                else:
+                    drop_row = self.task_model.store_row(drop_row)
+
                 if source_q == self.quadrant_name:
-                    # 同象限拖动：处理行索引偏移
-                    self.takeItem(source_row)
-                    insert_pos = drop_row if source_row > drop_row else max(0, drop_row - 1)
-                    self.insertItem(insert_pos, new_item)
+                    # 同象限拖动：整体重排一次，插入点扣除排在它前面的被拖任务
+                    dragged = set(tasks)
+                    old = self.task_model.tasks
+                    insert_pos = drop_row - sum(1 for row in source_rows if row < drop_row)
+                    rest = [task for task in old if task not in dragged]
+                    new = rest[:insert_pos] + tasks + rest[insert_pos:]
+                    moves = reorder_moves(old, new)
+                    self.task_model.reorder(new)
                 else:
-                    # 跨象限拖动：从原列表删除
-                    if hasattr(self.window(), 'quadrants'):
-                        src_list = self.window().quadrants.get(source_q)
-                        if src_list: src_list.takeItem(source_row)
-                    self.insertItem(drop_row, new_item)
-
-                # 恢复字体并保存
-                if hasattr(self.window(), 'task_font_size'):
-                    font = new_item.font()
-                    font.setPointSize(self.window().task_font_size)
-                    new_item.setFont(font)
-                    new_item.update_appearance()
-                
-                self.setCurrentItem(new_item)
+                    # 跨象限拖动：从原列表整批取出，直接移动原有记录
+                    src_list.task_model.remove_tasks(source_rows)
+                    insert_pos = drop_row
+                    self.task_model.insert_tasks(insert_pos, tasks)
+                    # 第 k 个被取出时，前面已有 k 个任务移走
+                    moves = [(row - k, insert_pos + k, task) for k, (row, task) in enumerate(located)]
+
+                self.select_rows(range(insert_pos, insert_pos + len(tasks)))
                 event.acceptProposedAction()
-                if hasattr(self.window(), "save_state"):
-                    self.window().save_state()
+                self.record_batch([
+                    {"op": "move", "q": source_q, "row": row, "id": task.id,
+                     "to_q": self.quadrant_name, "to_row": to_row}
+                    for row, to_row, task in moves
+                ])
             except Exception as e:
                 print(f"Drop error: {e}")
 
 
+# --- 4. 导出：后台线程与对话框 ---
+class ExportWorker(QThread):
+    """
+    在后台线程执行导出。
+    sources 只保存各象限任务对象的引用（不复制任务内容），行数据在写出时逐条生成。
+    """
+
+    progress = pyqtSignal(int)
+    finished_export = pyqtSignal(object)  # 写出的条数；被取消时为 None
+    failed = pyqtSignal(str)
+
+    def __init__(self, path: str, fmt: str, sources, export_filter: ExportFilter, archive=None, parent=None):
+        super().__init__(parent)
+        self.path = path
+        self.fmt = fmt
+        self.sources = sources
+        self.export_filter = export_filter
+        self.archive = archive
+        self.cancel_event = threading.Event()
+
+    def cancel(self):
+        self.cancel_event.set()
+
+    def run(self):
+        try:
+            rows = iter_export_rows(self.sources, self.export_filter, self.archive)
+            written = write_export(
+                self.path, self.fmt, rows, self.progress.emit, self.cancel_event
+            )
+        except Exception as e:
+            self.failed.emit(str(e))
+            return
+        self.finished_export.emit(written)
+
+
+class ExportDialog(QDialog):
+    """导出选项：格式、象限、完成状态、创建/完成日期范围"""
+
+    def __init__(self, quadrant_names, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("导出任务")
+        layout = QVBoxLayout(self)
+
+        # 格式
+        fmt_row = QHBoxLayout()
+        fmt_row.addWidget(QLabel("格式："))
+        self.fmt_combo = QComboBox()
+        for key, (label, _) in EXPORT_FORMATS.items():
+            self.fmt_combo.addItem(label, key)
+        fmt_row.addWidget(self.fmt_combo)
+        layout.addLayout(fmt_row)
+
+        # 象限
+        quadrant_row = QHBoxLayout()
+        quadrant_row.addWidget(QLabel("象限："))
+        self.quadrant_combo = QComboBox()
+        self.quadrant_combo.addItem("全部", None)
+        for name in quadrant_names:
+            self.quadrant_combo.addItem(name, name)
+        quadrant_row.addWidget(self.quadrant_combo)
+        layout.addLayout(quadrant_row)
+
+        # 完成状态（默认与以前一样，只导出已完成事项）
+        done_row = QHBoxLayout()
+        done_row.addWidget(QLabel("状态："))
+        self.done_combo = QComboBox()
+        self.done_combo.addItem("已完成", True)
+        self.done_combo.addItem("未完成", False)
+        self.done_combo.addItem("全部", None)
+        done_row.addWidget(self.done_combo)
+        layout.addLayout(done_row)
+
+        # 查询语句，与搜索框的写法相同，和上面的条件同时生效
+        query_row = QHBoxLayout()
+        query_row.addWidget(QLabel("查询："))
+        self.query_input = QLineEdit()
+        self.query_input.setPlaceholderText("如 done:false created>2026-01-01 text:报告")
+        self.query_input.setToolTip(QUERY_HELP)
+        self.query = TaskQuery()
+        query_row.addWidget(self.query_input)
+        layout.addLayout(query_row)
+
+        # 是否包含已归档的任务（归档只在这里按需读取）。
+        # 归档的都是已完成任务，导出已完成任务时默认勾选，否则自动归档过的任务会被漏掉
+        self.archive_chk = QCheckBox("包含已归档的任务")
+        layout.addWidget(self.archive_chk)
+        self.done_combo.currentIndexChanged.connect(self._sync_archive_chk)
+        self._sync_archive_chk()
+
+        # 日期范围
+        today = QDate.currentDate()
+        self.created_chk, self.created_from, self.created_to = self._add_date_range(
+            layout, "创建日期：", today
+        )
+        self.finished_chk, self.finished_from, self.finished_to = self._add_date_range(
+            layout, "完成日期：", today
+        )
+
+        # 确认/取消按钮
+        btn_row = QHBoxLayout()
+        ok_btn = QPushButton("导出")
+        cancel_btn = QPushButton("取消")
+        ok_btn.clicked.connect(self.accept)
+        cancel_btn.clicked.connect(self.reject)
+        btn_row.addStretch()
+        btn_row.addWidget(ok_btn)
+        btn_row.addWidget(cancel_btn)
+        layout.addLayout(btn_row)
+
+    def accept(self):
+        """查询语句写错时提示并留在对话框中"""
+        try:
+            self.query = TaskQuery.parse(self.query_input.text())
+        except QueryError as e:
+            QMessageBox.warning(self, "查询语句有误", str(e))
+            return
+        super().accept()
+
+    def _sync_archive_chk(self):
+        includes_done = self.done_combo.currentData() is not False
+        self.archive_chk.setChecked(includes_done)
+        self.archive_chk.setEnabled(includes_done)
+
+    def _add_date_range(self, layout, title, today):
+        row = QHBoxLayout()
+        chk = QCheckBox(title)
+        date_from = QDateEdit(today.addMonths(-1))
+        date_to = QDateEdit(today)
+        for edit in (date_from, date_to):
+            edit.setCalendarPopup(True)
+            edit.setDisplayFormat("yyyy-MM-dd")
+            edit.setEnabled(False)
+            chk.toggled.connect(edit.setEnabled)
+        row.addWidget(chk)
+        row.addWidget(date_from)
+        row.addWidget(QLabel("至"))
+        row.addWidget(date_to)
+        layout.addLayout(row)
+        return chk, date_from, date_to
+
+    def selected_format(self) -> str:
+        return self.fmt_combo.currentData()
+
+    def include_archive(self) -> bool:
+        return self.archive_chk.isChecked()
+
+    def export_filter(self) -> ExportFilter:
+        quadrant = self.quadrant_combo.currentData()
+        export_filter = ExportFilter(
+            quadrants={quadrant} if quadrant else None,
+            done=self.done_combo.currentData(),
+            query=None if self.query.is_empty() else self.query,
+        )
+        if self.created_chk.isChecked():
+            export_filter.created_from = self.created_from.date().toString("yyyy-MM-dd")
+            export_filter.created_to = self.created_to.date().toString("yyyy-MM-dd")
+        if self.finished_chk.isChecked():
+            export_filter.finished_from = self.finished_from.date().toString("yyyy-MM-dd")
+            export_filter.finished_to = self.finished_to.date().toString("yyyy-MM-dd")
+        return export_filter
+
+
+# --- 5. 导入：后台线程 ---
+class ImportWorker(QThread):
+    """
+    在后台线程解析导入文件，每凑满 batch_size 条合法任务发出一次 batch_ready，
+    由界面线程整批插入并记录一次改动。
+    """
+
+    batch_ready = pyqtSignal(list)
+    progress = pyqtSignal(int)  # 已读取的百分比
+    finished_import = pyqtSignal(object, list)  # 导入条数（被取消为 None），错误信息
+
+    MAX_ERRORS = 20  # 最多保留的错误信息条数
+
+    def __init__(self, path: str, quadrant_names, default_quadrant: str, batch_size: int = 1000, parent=None):
+        super().__init__(parent)
+        self.path = path
+        self.quadrant_names = set(quadrant_names)
+        self.default_quadrant = default_quadrant
+        self.batch_size = batch_size
+        self.cancel_event = threading.Event()
+
+    def cancel(self):
+        self.cancel_event.set()
+
+    def run(self):
+        fmt = "csv" if self.path.lower().endswith(".csv") else "ndjson"
+        size = max(os.path.getsize(self.path), 1)
+        imported = 0
+        errors = []
+        batch = []
+        try:
+            with open(self.path, "rb") as raw:
+                text_file = io.TextIOWrapper(raw, encoding="utf-8-sig", newline="")
+                for line_no, row in iter_import_rows(text_file, fmt):
+                    if self.cancel_event.is_set():
+                        self.finished_import.emit(None, errors)
+                        return
+                    try:
+                        if row is None:
+                            raise ValueError("无法解析")
+                        row = {IMPORT_COLUMNS.get(k, k): v for k, v in row.items()}
+                        batch.append(validate_import_row(row, self.quadrant_names, self.default_quadrant))
+                    except ValueError as e:
+                        if len(errors) < self.MAX_ERRORS:
+                            errors.append(f"第 {line_no} 行：{e}")
+                        continue
+                    if len(batch) >= self.batch_size:
+                        self.batch_ready.emit(batch)
+                        imported += len(batch)
+                        batch = []
+                        self.progress.emit(min(99, raw.tell() * 100 // size))
+        except (OSError, ValueError) as e:
+            errors.append(str(e))
+        if batch:
+            self.batch_ready.emit(batch)
+            imported += len(batch)
+        self.progress.emit(100)
+        self.finished_import.emit(imported, errors)
+
+
+class StartupTimer:
+    """记录启动各阶段耗时；命令行带 --startup-timing 时在启动完成后输出报告"""
+
+    def __init__(self, started_at: float):
+        self.started_at = self._last = started_at
+        self.phases = []  # [(阶段名, 秒)]
+
+    def mark(self, phase: str):
+        now = time.perf_counter()
+        self.phases.append((phase, now - self._last))
+        self._last = now
+
+    def report(self) -> str:
+        lines = ["启动耗时："]
+        lines.extend(f"  {phase}：{seconds * 1000:.1f} ms" for phase, seconds in self.phases)
+        lines.append(f"  合计：{(self._last - self.started_at) * 1000:.1f} ms")
+        return "\n".join(lines)
 
 
 def create_tray_icon():
@@ -473,14 +1348,328 @@ def create_tray_icon():
     return QIcon(pixmap)
 
 
+# --- 6. 单实例：后启动的实例把命令行转发给已运行的实例 ---
+# （转发用的 instance_server_name / forward_to_running_instance 在文件开头，导入界面模块之前）
+def parse_app_args(argv: list):
+    """解析挂件的命令行参数（忽略 Qt 自己的参数）"""
+    import argparse  # 只在启动和转发命令时使用
+
+    parser = argparse.ArgumentParser(prog="四象限任务清单")
+    parser.add_argument("--show", action="store_true", help="显示主界面")
+    parser.add_argument("--add", action="append", metavar="内容", help="添加任务，可重复")
+    parser.add_argument("--quadrant", choices=QUADRANT_NAMES, default=DEFAULT_QUADRANT, help="--add 添加到的象限")
+    parser.add_argument("--export", metavar="路径", help="导出全部任务（按扩展名判断格式）")
+    parser.add_argument("--startup-timing", action="store_true", help="启动完成后输出各阶段耗时")
+    args, _ = parser.parse_known_args(argv)
+    return args
+
+
+class InstanceServer(QLocalServer):
+    """
+    接收后启动的实例转发来的命令行参数（每个连接一行 JSON），
+    交给 handler(argv, reply) 执行；handler 完成后（可能稍后才完成，例如后台导出）
+    调用 reply(结果)，回复一行 JSON 结果并断开。
+    在创建界面之前 start() 占用名称；界面创建好后 set_handler()，期间到达的连接排队等待。
+    """
+
+    def __init__(self, server_name: str, handler=None, parent=None):
+        super().__init__(parent)
+        self.server_name = server_name
+        self.handler = None
+        self._buffers = {}
+        self._waiting = set()  # 已收到命令、尚未回复的连接
+        if handler is not None:
+            self.set_handler(handler)
+
+    def start(self) -> bool:
+        """占用实例名称；名称属于另一个正在运行的实例时返回 False"""
+        if self.listen(self.server_name):
+            return True
+        # 能连上说明另一个实例正在运行，不能删除它的名称
+        probe = QLocalSocket()
+        probe.connectToServer(self.server_name)
+        if probe.waitForConnected(1000):
+            probe.abort()
+            return False
+        # 连不上：上次异常退出留下的套接字文件（Unix）导致监听失败，清理后重试
+        QLocalServer.removeServer(self.server_name)
+        return self.listen(self.server_name)
+
+    def set_handler(self, handler):
+        """开始处理转发来的命令，包括设置之前已经排队的连接"""
+        self.handler = handler
+        self.newConnection.connect(self._on_new_connection)
+        self._on_new_connection()
+
+    def _on_new_connection(self):
+        while self.hasPendingConnections():
+            socket = self.nextPendingConnection()
+            self._buffers[socket] = b""
+            socket.readyRead.connect(lambda s=socket: self._on_ready_read(s))
+            socket.disconnected.connect(lambda s=socket: self._on_disconnected(s))
+            if socket.bytesAvailable():
+                self._on_ready_read(socket)
+
+    def _on_disconnected(self, socket):
+        self._buffers.pop(socket, None)
+        self._waiting.discard(socket)
+        socket.deleteLater()
+
+    def _on_ready_read(self, socket):
+        if socket not in self._buffers:
+            return
+        self._buffers[socket] += bytes(socket.readAll())
+        if not self._buffers[socket].endswith(b"\n"):
+            return
+        data = self._buffers.pop(socket)
+        self._waiting.add(socket)
+        try:
+            argv = json.loads(data).get("argv") or []
+            self.handler([str(a) for a in argv], lambda reply, s=socket: self._reply(s, reply))
+        except (ValueError, AttributeError, TypeError):
+            self._reply(socket, {"ok": False, "message": "无法识别的命令"})
+
+    def _reply(self, socket, reply: dict):
+        if socket not in self._waiting:
+            # 对方已经断开（等待超时）
+            return
+        self._waiting.discard(socket)
+        socket.write((json.dumps(reply, ensure_ascii=False) + "\n").encode("utf-8"))
+        socket.flush()
+        socket.disconnectFromServer()
+
+
+# --- 7. 本地 HTTP 接口：其他工具通过 JSON 读写任务 ---
+class ApiError(Exception):
+    """接口请求无法执行，status 为返回的 HTTP 状态码"""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+class ApiRequest:
+    """一次接口调用：后台线程解析后排队，界面线程执行后填入 status 和 result"""
+
+    __slots__ = ("action", "task_id", "body", "query", "status", "result", "done")
+
+    def __init__(self, action: str, task_id: Optional[str] = None, body=None, query: Optional[dict] = None):
+        self.action = action
+        self.task_id = task_id
+        self.body = body
+        self.query = query or {}
+        self.status = 500
+        self.result = {"error": "请求未执行"}
+        self.done = threading.Event()
+
+
+def route_api_request(method: str, path: str, body) -> ApiRequest:
+    """
+    把 HTTP 方法和路径映射为接口操作：
+    GET /tasks[?quadrant=象限]、POST /tasks、POST /tasks/<id>/toggle、
+    POST /tasks/<id>/move、DELETE /tasks/<id>
+    """
+    from urllib.parse import urlsplit, parse_qs, unquote
+
+    url = urlsplit(path)
+    parts = [unquote(p) for p in url.path.split("/") if p]
+    if parts[:1] == ["tasks"]:
+        if len(parts) == 1 and method == "GET":
+            query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+            return ApiRequest("list", query=query)
+        if len(parts) == 1 and method == "POST":
+            # 批量添加时请求体也可以直接是任务数组
+            if body is not None and not isinstance(body, (dict, list)):
+                raise ApiError(400, "请求体应为 JSON 对象或数组")
+            return ApiRequest("add", body=body)
+        if len(parts) == 2 and method == "DELETE":
+            return ApiRequest("delete", parts[1])
+        if len(parts) == 3 and method == "POST" and parts[2] in ("toggle", "move"):
+            if body is not None and not isinstance(body, dict):
+                raise ApiError(400, "请求体应为 JSON 对象")
+            return ApiRequest(parts[2], parts[1], body=body)
+    raise ApiError(404, "接口不存在")
+
+
+def make_api_handler(api_server):
+    """生成 http.server 的请求处理类（只有启用接口时才导入 http.server）"""
+    from http.server import BaseHTTPRequestHandler
+
+    class ApiRequestHandler(BaseHTTPRequestHandler):
+        server_version = "EisenhowerDesktopTask"
+
+        def log_message(self, format, *args):
+            pass  # 不输出访问日志
+
+        def _reply(self, status: int, payload: dict):
+            body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _handle(self):
+            try:
+                # 只接受本机工具：拒绝其他主机名（DNS 重绑定）和浏览器网页发来的跨站请求
+                host = (self.headers.get("Host") or "").rsplit(":", 1)[0]
+                if host not in ("127.0.0.1", "localhost") or self.headers.get("Origin"):
+                    raise ApiError(403, "只接受本机程序的请求")
+                try:
+                    length = int(self.headers.get("Content-Length") or 0)
+                except ValueError:
+                    raise ApiError(400, "Content-Length 无效")
+                if not 0 <= length <= api_server.MAX_BODY:
+                    raise ApiError(400, f"请求体长度应在 0 到 {api_server.MAX_BODY} 字节之间")
+                body = None
+                try:
+                    if length:
+                        body = json.loads(self.rfile.read(length))
+                except ValueError:
+                    raise ApiError(400, "请求体不是有效的 JSON")
+                request = route_api_request(self.command, self.path, body)
+            except ApiError as e:
+                self._reply(e.status, {"error": e.message})
+                return
+            if not api_server.submit(request):
+                self._reply(504, {"error": "程序繁忙，请稍后重试"})
+                return
+            self._reply(request.status, request.result)
+
+        do_GET = do_POST = do_DELETE = _handle
+
+    return ApiRequestHandler
+
+
+class TaskApiServer(QObject):
+    """
+    只监听 127.0.0.1 的 HTTP/JSON 接口（http.server，后台线程处理连接）。
+    请求在后台线程解析后排队；界面线程稍等片刻，把这段时间内到达的请求整批交给 handler 执行，
+    后台线程等待结果后再回复。界面线程只执行排好队的操作，从不等待网络。
+    """
+
+    requests_ready = pyqtSignal()
+    BATCH_DELAY_MS = 10  # 收到请求后等待多久再整批执行，让同时到达的请求合并为一次提交
+    REPLY_TIMEOUT = 10  # 界面线程超过多少秒未执行就回复超时
+    MAX_BODY = 1 << 20  # 请求体最大字节数
+
+    def __init__(self, handler, parent=None):
+        super().__init__(parent)
+        self.handler = handler  # handler(请求列表)，在界面线程中执行并填入结果
+        self.port = 0
+        self._queue = deque()
+        self._lock = threading.Lock()
+        self._httpd = None
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(self.BATCH_DELAY_MS)
+        self._timer.timeout.connect(self._drain)
+        # 后台线程发出的信号排队到界面线程执行
+        self.requests_ready.connect(self._schedule)
+
+    def start(self, port: int) -> int:
+        """开始监听并返回实际端口（port 为 0 时由系统分配）；端口被占用时抛出 OSError"""
+        from http.server import ThreadingHTTPServer
+
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", port), make_api_handler(self))
+        self._httpd.daemon_threads = True
+        self.port = self._httpd.server_address[1]
+        threading.Thread(target=self._httpd.serve_forever, name="TaskApiServer", daemon=True).start()
+        return self.port
+
+    def stop(self):
+        if self._httpd is None:
+            return
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        self._httpd = None
+        with self._lock:
+            pending = list(self._queue)
+            self._queue.clear()
+        for request in pending:
+            request.status, request.result = 503, {"error": "接口已关闭"}
+            request.done.set()
+
+    def submit(self, request: ApiRequest) -> bool:
+        """
+        （后台线程）排队并等待界面线程执行，返回是否已执行。
+        超时时把请求移出队列，回复超时的请求之后不会再被执行
+        """
+        with self._lock:
+            self._queue.append(request)
+        self.requests_ready.emit()
+        if request.done.wait(self.REPLY_TIMEOUT):
+            return True
+        with self._lock:
+            if request in self._queue:
+                self._queue.remove(request)
+                return False
+        # 界面线程已经取走，正在执行：等它完成，按实际结果回复
+        request.done.wait()
+        return True
+
+    def _schedule(self):
+        # 已在等待中则不重新计时，持续有请求时也按固定间隔提交
+        if not self._timer.isActive():
+            self._timer.start()
+
+    def _drain(self):
+        with self._lock:
+            batch = list(self._queue)
+            self._queue.clear()
+        if not batch:
+            return
+        try:
+            self.handler(batch)
+        finally:
+            for request in batch:
+                request.done.set()
+
+
 class EisenhowerApp(QWidget):
+    POPULATE_CHUNK = 2000  # 启动时每次事件循环向一个象限填充的任务数
+    POS_SAVE_DELAY_MS = 1000  # 窗口停止移动多久后保存位置
+    MERGE_DELAY_MS = 200  # 数据文件被其他进程修改后，等待多久再合并
+
     def __init__(self):
         super().__init__()
+        # 分阶段启动：先创建界面并读取数据，窗口显示后再分批填充任务，最后才创建托盘、写开机自启
+        self.startup = StartupTimer(STARTED_AT)
+        self.startup.mark("导入模块")
         self.target_date = QDate(2026, 2, 6)
         self._is_locked = False  # 锁定状态标记
         self._drag_pos = QPoint()  # 用于处理无边框拖动
         # JSON 数据文件，用于保存除位置以外的所有内容
         self.data_file = self.get_config_path()
+        # 存储后端（JSON 快照 + 改动日志，或 SQLite），选择保存在 QSettings 中
+        self.storage_backend = QSettings("MyStudio", "EisenhowerDesktop").value("storage_backend", "json")
+        if self.storage_backend not in STORAGE_BACKENDS:
+            self.storage_backend = "json"
+        self.storage = open_storage(self.storage_backend, self.data_file)
+        # 四个象限共用的搜索索引（第一次搜索时才建立）
+        self.search_index = SearchIndex()
+        # 任务 ID -> (象限, 行) 的全局索引
+        self.task_index = TaskIndex()
+        self._loading = False  # 加载期间不记录改动
+        # 已完成任务的归档（只追加，按需读取）
+        self.archive = TaskArchive(archive_path(self.data_file))
+        self.archive_after_days = 30  # 完成超过 N 天的任务自动归档，0 为不按天数归档
+        self.archive_keep_done = 0  # 每个象限最多保留 M 条已完成任务，0 为不限
+        self._last_archive_date = None
+        # 写盘放到后台线程，连续改动在间隔内合并为一次写入
+        self.save_interval_ms = 500
+        self.writer = StateWriter(self.storage, self.save_interval_ms, self.archive)
+        self.writer.start()
+        # 撤销 / 重做（保存改动记录本身，步数可在设置中修改）
+        self.history = UndoHistory(100)
+        # 其他进程（另一个挂件、命令行）写入数据文件时，稍等片刻再合并它们的改动
+        self._watcher = None
+        self._watched_stamps = None  # 上次看到的各数据文件 (mtime, 大小)
+        self._merge_timer = QTimer(self)
+        self._merge_timer.setSingleShot(True)
+        self._merge_timer.setInterval(self.MERGE_DELAY_MS)
+        self._merge_timer.timeout.connect(self.merge_external_changes)
         # 字体大小设置（可通过设置面板调整）
         self.title_font_size = 20
         self.event_font_size = 12
@@ -489,36 +1678,38 @@ class EisenhowerApp(QWidget):
         self.quadrant_title_font_size = 12  # 新增：象限标题字体大小
         # 开机自启设置
         self.auto_start_enabled = False
+        # 本地 HTTP 接口端口，0 为关闭（启动完成后才开始监听）
+        self.api_port = 0
+        self.api_server = None
+        self._command_exports = set()  # 命令行转发来的、正在后台进行的导出
         # 窗口大小设置（初始值与默认 resize 一致）
         self.window_width = 400
         self.window_height = 600
-        
-        # 先初始化托盘
-        self.init_tray()
-        
-        # 再初始化窗口
+        self._pending_population = deque()  # 待填充的 [象限名, 任务列表, 已填充数]
+        self.startup.mark("打开存储")
+
+        # 初始化窗口（托盘在任务填充完成后再创建）
         self.init_window_style()
         self.initUI()
+        self.startup.mark("创建界面")
 
-        # 加载上一次的完整状态（标题、事件名、任务列表等）
+        # 加载上一次的完整状态（标题、事件名等立即生效，任务在显示后分批填充）
         self.load_state()
+        self.watch_storage()
+        self.startup.mark("读取数据")
 
-        self.set_auto_start(False) # 默认开启开机不自启
-        
         self.timer = QTimer(self)
         self.timer.timeout.connect(self.update_countdown_display)
+        self.timer.timeout.connect(self.maybe_archive)
         self.timer.start(60000)
         self.update_countdown_display()
+        # 进入事件循环（窗口已显示）后开始填充任务
+        QTimer.singleShot(0, self._on_first_event_loop)
 
-    def get_config_path(self):
+    @staticmethod
+    def get_config_path():
         """获取配置文件路径"""
-        if getattr(sys, 'frozen', False):
-            # 打包环境：使用可执行文件目录
-            exe_dir = os.path.dirname(sys.executable)
-            return os.path.join(exe_dir, "tasks_data.json")
-        else:
-            # 开发环境：使用脚本目录
-            return os.path.join(os.path.dirname(os.path.abspath(__file__)), "tasks_data.json")
+        return app_data_file()
 
     def init_window_style(self):
         """设置桌面挂件特有的窗口属性"""
@@ -535,6 +1726,12 @@ class EisenhowerApp(QWidget):
         last_pos = self.settings.value("pos", QPoint(100, 100))
         if isinstance(last_pos, QPoint):
             self.move(last_pos)
+        # 拖动时位置只记在内存里，松开鼠标、停止移动一段时间或保存状态时才写入 QSettings
+        self._saved_pos = self.pos()
+        self._pos_timer = QTimer(self)
+        self._pos_timer.setSingleShot(True)
+        self._pos_timer.setInterval(self.POS_SAVE_DELAY_MS)
+        self._pos_timer.timeout.connect(self.flush_position)
 
     def initUI(self):
         self.setWindowTitle("桌面任务挂件")
@@ -544,13 +1741,7 @@ class EisenhowerApp(QWidget):
         # 主外壳，用于设置带圆角的半透明背景
         self.main_frame = QFrame(self)
         self.main_frame.setObjectName("MainFrame")
-        self.main_frame.setStyleSheet("""
-            QFrame#MainFrame {
-                background-color: rgba(37, 52, 57, 230); /* 85% 不透明度 */
-                border-radius: 10px;
-                border: 1px solid rgba(255, 255, 255, 10);
-            }
-        """)
+        self.main_frame.setStyleSheet(Theme.MAIN_FRAME_STYLE)
         
         # 全局布局包装在 main_frame 中
         outer_layout = QVBoxLayout(self)
@@ -672,8 +1863,8 @@ class EisenhowerApp(QWidget):
         self.cd_days_label.setAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
 
         # 标题和事件名改动时自动保存
-        self.main_title.textChanged.connect(self.save_state)
-        self.event_name_input.textChanged.connect(self.save_state)
+        self.main_title.textChanged.connect(self.on_header_changed)
+        self.event_name_input.textChanged.connect(self.on_header_changed)
 
         # 将各部分添加到header_layout，按比例分配空间
         # 总比例: 5%(按钮) + 45%(标题) + 25%(事件日期) + 20%(倒计时) = 95%，剩下5%作为间隔
@@ -689,15 +1880,31 @@ class EisenhowerApp(QWidget):
         self.task_input = QLineEdit()
         self.task_input.setPlaceholderText("新增任务...")
         self.task_input.setFixedHeight(35)
-        self.task_input.setStyleSheet("background: rgba(255,255,255,0.08); border: 1px solid rgba(255,255,255,0.1); color: white; padding: 0 10px; border-radius: 8px;")
+        self.task_input.setStyleSheet(Theme.INPUT_STYLE)
         self.task_input.returnPressed.connect(self.add_task)
         
         self.export_btn = QPushButton("导出")
         self.export_btn.setFixedSize(60, 35)
-        self.export_btn.setStyleSheet("background: rgba(255,255,255,0.12); color: white; border-radius: 8px;")
+        self.export_btn.setStyleSheet(Theme.SMALL_BUTTON_STYLE)
         self.export_btn.clicked.connect(self.export_tasks)
+
+        self.import_btn = QPushButton("导入")
+        self.import_btn.setFixedSize(60, 35)
+        self.import_btn.setStyleSheet(Theme.SMALL_BUTTON_STYLE)
+        self.import_btn.clicked.connect(self.import_tasks)
+        
+        # 搜索框：输入时实时筛选四个象限
+        self.search_input = QLineEdit()
+        self.search_input.setPlaceholderText("🔍 搜索...")
+        self.search_input.setFixedHeight(35)
+        self.search_input.setClearButtonEnabled(True)
+        self.search_input.setToolTip(QUERY_HELP)
+        self.search_input.setStyleSheet(Theme.INPUT_STYLE)
+        self.search_input.textChanged.connect(self.apply_search)
         
-        input_bar.addWidget(self.task_input)
+        input_bar.addWidget(self.task_input, stretch=3)
+        input_bar.addWidget(self.search_input, stretch=2)
+        input_bar.addWidget(self.import_btn)
         input_bar.addWidget(self.export_btn)
         main_layout.addLayout(input_bar)
 
@@ -717,29 +1924,261 @@ class EisenhowerApp(QWidget):
             card.setStyleSheet(f"background-color: {color}; border-radius: 15px;")
             vbox = QVBoxLayout(card)
             lbl = QLabel(title)
-            # lbl.setStyleSheet("color: rgba(255,255,255,0.5); font-size: 12px; font-weight: bold;")
-            lbl.setStyleSheet(f"color: rgba(255,255,255,0.5); font-size: {self.quadrant_title_font_size}px; font-weight: bold;")  # 修改：使用变量
+            lbl.setStyleSheet(Theme.quadrant_title_style(self.quadrant_title_font_size))
             self.quadrant_labels[title] = lbl  # 新增：保存标签引用
-            list_w = QuadrantList(title)
-            list_w.itemClicked.connect(self.on_item_clicked)
+            list_w = QuadrantList(title, self.search_index, self.task_index)
+            list_w.clicked.connect(lambda index, lw=list_w: self.on_task_clicked(lw, index.row()))
             vbox.addWidget(lbl)
             vbox.addWidget(list_w)
             grid.addWidget(card, r, c)
             self.quadrants[title] = list_w
         main_layout.addLayout(grid)
 
+        # 撤销 / 重做快捷键（输入框获得焦点时由输入框自己处理）
+        QShortcut(QKeySequence.StandardKey.Undo, self, self.undo)
+        QShortcut(QKeySequence.StandardKey.Redo, self, self.redo)
+        QShortcut(QKeySequence("Ctrl+Y"), self, self.redo)
+
         # 初始时根据当前字体设置应用一次字体
         self.apply_font_settings()
 
     # ====== 状态保存/恢复 ======
+    def record_change(self, record: dict, undoable: bool = True):
+        """
+        记录一次改动（新增/勾选/移动/删除/排序/标题等），只向日志追加一行；
+        日志达到压缩阈值时再整体写一次快照。任务改动同时压入撤销栈。
+        """
+        if self._loading:
+            return
+        if undoable:
+            self.history.push(record)
+        if self.writer.submit_record(record):
+            self.save_state()
+
+    def apply_record(self, record: dict):
+        """把一条改动记录应用到看板（撤销 / 重做时使用）"""
+        op = record["op"]
+        if op == "batch":
+            for sub in record["records"]:
+                self.apply_record(sub)
+            return
+        model = self.quadrants[record["q"]].task_model
+        if op == "add":
+            model.insert_task(record["row"], TaskItem.from_dict(record["task"]))
+        elif op == "add_many":
+            model.insert_tasks(record["row"], [TaskItem.from_dict(t) for t in record["tasks"]])
+        elif op == "update":
+            task = model.task(record["row"])
+            for key, value in (record.get("fields") or {}).items():
+                if key in TaskItem.__slots__:
+                    setattr(task, key, value)
+            model.task_changed(record["row"])
+        elif op == "move":
+            if record["to_q"] == record["q"]:
+                model.move_task(record["row"], record["to_row"])
+            else:
+                task = model.take_task(record["row"])
+                self.quadrants[record["to_q"]].task_model.insert_task(record["to_row"], task)
+        elif op == "delete":
+            model.take_task(record["row"])
+
+    def _replay_history(self, record: dict):
+        """应用撤销 / 重做产生的记录，并作为普通改动写入日志"""
+        for list_widget in self.quadrants.values():
+            list_widget.setUpdatesEnabled(False)
+        try:
+            self.apply_record(record)
+        finally:
+            for list_widget in self.quadrants.values():
+                list_widget.setUpdatesEnabled(True)
+        self.record_change(record, undoable=False)
+        self.refresh_search()
+
+    def undo(self):
+        record = self.history.undo()
+        if record is not None:
+            self._replay_history(invert_record(record))
+
+    def redo(self):
+        record = self.history.redo()
+        if record is not None:
+            self._replay_history(record)
+
+    def switch_storage(self, backend: str):
+        """切换存储后端，并把当前完整状态写入新后端"""
+        storage = open_storage(backend, self.data_file)
+        storage.needs_compact = True
+        self.writer.set_storage(storage)
+        self.storage = storage
+        self.storage_backend = backend
+        QSettings("MyStudio", "EisenhowerDesktop").setValue("storage_backend", backend)
+        self.save_state()
+        self.watch_storage()
+
+    def watch_storage(self):
+        """监视当前存储的数据文件（SQLite 后端由数据库自己加锁，不监视）"""
+        if self._watcher is None:
+            self._watcher = QFileSystemWatcher(self)
+            self._watcher.fileChanged.connect(self._on_storage_changed)
+            self._watcher.directoryChanged.connect(self._on_storage_changed)
+        watched = self._watcher.files() + self._watcher.directories()
+        if watched:
+            self._watcher.removePaths(watched)
+        paths = self.storage.watch_paths()
+        if paths:
+            # 监视目录才能发现快照被替换、日志被创建
+            self._watcher.addPath(os.path.dirname(os.path.abspath(paths[0])))
+            self._on_storage_changed()
+
+    def _on_storage_changed(self, path: str = ""):
+        paths = self.storage.watch_paths()
+        # 文件被替换后监视会失效，重新加入
+        missing = [p for p in paths if os.path.exists(p) and p not in self._watcher.files()]
+        if missing:
+            self._watcher.addPaths(missing)
+        # 目录中的锁文件、导出的临时文件、缓存等变化也会触发，只有数据文件本身变了才合并
+        stamps = []
+        for p in paths:
+            try:
+                st = os.stat(p)
+                stamps.append((st.st_mtime_ns, st.st_size))
+            except OSError:
+                stamps.append(None)
+        if path and stamps != self._watched_stamps:
+            self._merge_timer.start()
+        self._watched_stamps = stamps
+
+    def merge_external_changes(self, blocking: bool = False):
+        """
+        合并其他进程写入的改动，不重新加载整个界面：
+        日志中新增的记录按任务 ID 定位后逐条应用到模型（不按行号，本地可能有尚未写出的改动）；
+        快照被整体重写时，把本地待写的记录按 ID 重放到新状态上，再按任务比较、只替换有变化的象限。
+        数据文件正被其他进程锁定时不在界面线程等待，稍后由定时器重试（退出时 blocking 才等待）
+        """
+        if self._pending_population:
+            # 填充完成前任务索引还不完整，稍后再合并
+            self._merge_timer.start()
+            return
+        local = []
+        # 先暂停写盘线程（它可能正持有锁写入），再尝试加锁
+        with self.writer.paused():
+            if not self.storage.lock.acquire(blocking):
+                self._merge_timer.start()
+                return
+            try:
+                records, state = self.storage.read_changes()
+            except (OSError, ValueError):
+                return
+            finally:
+                self.storage.lock.release()
+            if records:
+                self._apply_external_records(records)
+            elif records is None:
+                if state is not None:
+                    local = self.writer.discard_records()
+                    self._merge_state(rebase_records(state, local) if local else state)
+                else:
+                    # 数据文件被删除：保留当前看板并重新写出
+                    self.storage.needs_compact = True
+            else:
+                return
+            # 本地还有待写内容，或与外部改动交错写入过：以合并后的界面重写一次快照，
+            # 待写的记录已包含在内存状态中，随快照一起写出
+            needs_save = self.storage.needs_compact or self.writer.has_pending() or bool(local)
+        # 行号已变化，撤销栈中的记录不再可靠
+        self.history.clear()
+        self.refresh_search()
+        if needs_save:
+            self.save_state()
+
+    def _apply_external_records(self, records: list):
+        for list_widget in self.quadrants.values():
+            list_widget.setUpdatesEnabled(False)
+        try:
+            for record in records:
+                record = self._resolve_external_record(record)
+                if record is not None:
+                    self.apply_record(record)
+        finally:
+            for list_widget in self.quadrants.values():
+                list_widget.setUpdatesEnabled(True)
+
+    def _resolve_external_record(self, record: dict) -> Optional[dict]:
+        """
+        把其他进程的改动记录换算到当前看板，返回可以直接 apply_record 的记录；无需应用时返回 None。
+        其行号基于磁盘上的状态，与本地尚未写出的改动不一致，因此按任务 ID 重新定位：
+        本地已删除的任务跳过，已存在的新增任务跳过，插入位置夹到象限末尾
+        """
+        op = record.get("op")
+        if op == "batch":
+            subs = [r for r in map(self._resolve_external_record, record["records"]) if r is not None]
+            return {"op": "batch", "records": subs} if subs else None
+        if op == "meta" or record.get("q") not in self.quadrants:
+            # 标题、字体等设置只由界面修改，其他进程的设置记录不覆盖当前界面
+            return None
+        model = self.quadrants[record["q"]].task_model
+        if op == "add":
+            if record["task"].get("id") in self.task_index:
+                return None
+            return dict(record, row=min(record["row"], len(model.tasks)))
+        if op == "add_many":
+            tasks = [t for t in record["tasks"] if t.get("id") not in self.task_index]
+            if not tasks:
+                return None
+            return dict(record, row=min(record["row"], len(model.tasks)), tasks=tasks)
+        if op not in ("update", "move", "delete"):
+            return None
+        if record.get("id") is not None:
+            located = self.task_index.locate(record["id"])
+            if located is None:
+                return None
+            q_name, row = located
+        else:
+            # 旧版本写入的记录没有 ID，只能按行号应用
+            q_name, row = record["q"], record["row"]
+            if not 0 <= row < len(model.tasks):
+                return None
+        resolved = dict(record, q=q_name, row=row)
+        if op == "move":
+            to_q = record["to_q"]
+            if to_q not in self.quadrants:
+                return None
+            last = len(self.quadrants[to_q].task_model.tasks) - (1 if to_q == q_name else 0)
+            resolved["to_row"] = max(0, min(record["to_row"], last))
+        return resolved
+
+    def _merge_state(self, data: dict):
+        """与磁盘上的完整状态逐个象限比较，只重置有变化的象限"""
+        grouped, _, _ = group_state_tasks(data.get("tasks"), self.quadrants)
+        for name, list_widget in self.quadrants.items():
+            model = list_widget.task_model
+            tasks = grouped[name]
+            if [t.to_dict() for t in model.tasks] != [t.to_dict() for t in tasks]:
+                list_widget.setUpdatesEnabled(False)
+                model.set_tasks(tasks)
+                list_widget.setUpdatesEnabled(True)
+
+    def on_header_changed(self):
+        """标题、事件名修改时记录改动"""
+        self.record_change({
+            "op": "meta",
+            "fields": {
+                "main_title": self.main_title.text(),
+                "event_name": self.event_name_input.text(),
+            },
+        }, undoable=False)
+
     def save_state(self):
         """
-        保存当前界面状态到 JSON 文件：标题、事件名、日期、任务和锁定状态。
+        保存当前界面状态到 JSON 快照：标题、事件名、日期、任务和锁定状态，
+        同时清空改动日志。这里只生成快照并交给后台线程写盘。
         位置 pos 仍然使用 QSettings 单独保存。
         """
+        # 启动时尚未填充完的任务先补齐，避免快照缺少任务
+        self.finish_population()
+
         # 先保存位置
-        if hasattr(self, "settings"):
-            self.settings.setValue("pos", self.pos())
+        self.flush_position()
 
         # 保存当前窗口大小
         self.window_width = self.width()
@@ -752,6 +2191,11 @@ class EisenhowerApp(QWidget):
             "target_date": self.target_date.toString("yyyy-MM-dd"),
             "is_locked": self._is_locked,
             "auto_start": self.auto_start_enabled,
+            "save_interval_ms": self.save_interval_ms,
+            "undo_limit": self.history.limit,
+            "archive_after_days": self.archive_after_days,
+            "archive_keep_done": self.archive_keep_done,
+            "api_port": self.api_port,
             "window_size": {
                 "width": self.window_width,
                 "height": self.window_height,
@@ -767,44 +2211,45 @@ class EisenhowerApp(QWidget):
         }
 
         for q_name, list_widget in self.quadrants.items():
-            task_count = list_widget.count()
-            # print(f"保存象限: {q_name}, 任务数量: {task_count}")
-            for i in range(task_count):
-                item = list_widget.item(i)
-                if isinstance(item, TaskItem):
-                    data["tasks"].append(
-                        {
-                            "content": item.content,
-                            "quadrant": q_name,
-                            "created_at": item.created_at,
-                            "finished_at": item.finished_at,
-                            "is_done": item.is_done,
-                        }
-                    )
-
-        # 写入 JSON 文件
-        try:
-            with open(self.data_file, "w", encoding="utf-8") as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
-        except Exception:
-            # 即使保存失败，也不要影响程序运行
-            pass
+            for task in list_widget.task_model.tasks:
+                data["tasks"].append(dict(task.to_dict(), quadrant=q_name))
 
-    def load_state(self):
-        """从 JSON 文件恢复上一次保存的状态（标题、事件、日期、任务、锁定状态）"""
-        if not os.path.exists(self.data_file):
-            # 没有保存过数据，使用默认值即可
-            self.update_countdown_display()
-            return
+        # 交给后台线程写入 JSON 快照并清空日志
+        self.writer.submit_snapshot(data)
 
+    def load_state(self):
+        """
+        从 JSON 快照 + 改动日志恢复上一次保存的状态（标题、事件、日期、任务、锁定状态）。
+        任务不立即放入列表，而是由 _populate_step 在事件循环中分批填充
+        """
         try:
-            with open(self.data_file, "r", encoding="utf-8") as f:
-                data = json.load(f)
+            data = self.storage.load()
+            if data is None and self.storage_backend != "json":
+                # 第一次使用其他后端：从原有的 JSON 文件迁移数据
+                data = JsonStorage(self.data_file).load()
+                if data is not None:
+                    self.storage.needs_compact = True
         except Exception:
             # 文件损坏等情况，忽略错误，保持默认状态
+            data = None
+        self.writer.since_snapshot = self.storage.pending
+        if self.storage.needs_compact:
+            # 读取时从备份恢复或丢弃了损坏的日志，加载完成后立即写一份干净的快照
+            QTimer.singleShot(0, self.save_state)
+        if data is None:
+            # 没有保存过数据，使用默认值即可
             self.update_countdown_display()
             return
 
+        self._loading = True
+        try:
+            self._apply_state(data)
+        finally:
+            self._loading = False
+
+    def _apply_state(self, data: dict):
+        """把读取到的状态应用到界面"""
+
         # 标题、事件名
         main_title = data.get("main_title") or ""
         if main_title:
@@ -828,10 +2273,22 @@ class EisenhowerApp(QWidget):
         self.lock_btn.setChecked(is_locked)
         self.lock_btn.setText("🔒" if is_locked else "🔓")
 
-        # 开机自启
+        # 开机自启（注册表在启动完成后由 _finish_startup 写入一次）
         self.auto_start_enabled = bool(data.get("auto_start", False))
-        # 根据保存的设置应用一次开机自启逻辑
-        self.set_auto_start(self.auto_start_enabled)
+
+        # 自动保存间隔
+        self.save_interval_ms = int(data.get("save_interval_ms", self.save_interval_ms))
+        self.writer.interval_ms = self.save_interval_ms
+
+        # 撤销步数
+        self.history.set_limit(int(data.get("undo_limit", self.history.limit)))
+
+        # 归档策略
+        self.archive_after_days = int(data.get("archive_after_days", self.archive_after_days))
+        self.archive_keep_done = int(data.get("archive_keep_done", self.archive_keep_done))
+
+        # 本地 HTTP 接口
+        self.api_port = int(data.get("api_port", self.api_port))
 
         # 窗口大小
         size_cfg = data.get("window_size") or {}
@@ -849,32 +2306,95 @@ class EisenhowerApp(QWidget):
         self.countdown_font_size = int(font_cfg.get("countdown", self.countdown_font_size))  # 新增
         self.quadrant_title_font_size = int(font_cfg.get("quadrant_title", self.quadrant_title_font_size))  # 新增
 
-        # 任务列表
-        tasks_data = data.get("tasks") or []
-        # 先清空现有的任务
-        for list_widget in self.quadrants.values():
-            list_widget.clear()
-
-        for t in tasks_data:
-            quadrant = t.get("quadrant", "紧急重要")
-            content = t.get("content", "")
-            created_at = t.get("created_at")
-            finished_at = t.get("finished_at", "未完成")
-            is_done = t.get("is_done", False)
-            if content and quadrant in self.quadrants:
-                item = TaskItem(
-                    content,
-                    created_at=created_at,
-                    finished_at=finished_at,
-                    is_done=is_done,
-                )
-                self.quadrants[quadrant].addItem(item)
-
-        # 根据字体设置刷新一次字体样式
+        # 根据字体设置刷新一次字体样式（在填充任务之前，避免任务填充后再重新排版一次）
         self.apply_font_settings()
+
+        # 任务列表：先按象限分组，再整批放入模型
+        grouped, skipped, new_ids = group_state_tasks(data.get("tasks"), self.quadrants)
+
+        # 窗口先显示，任务由事件循环分批填充（各象限轮流，先填满可见区域）
+        for name, list_widget in self.quadrants.items():
+            list_widget.task_model.set_tasks([])
+            if grouped[name]:
+                self._pending_population.append([name, grouped[name], 0])
+        self._set_populating(bool(self._pending_population))
+
+        if skipped or new_ids:
+            # 跳过了无效任务（行号与快照不再一致）或补发了新 ID，重写一次快照
+            self.storage.needs_compact = True
+            QTimer.singleShot(0, self.save_state)
+
         # 更新倒计时显示
         self.update_countdown_display()
 
+    def _set_populating(self, populating: bool):
+        """填充期间禁用会改动任务的控件，避免改动记录的行号与磁盘上的完整数据不一致"""
+        for widget in (self.task_input, self.import_btn, self.export_btn, *self.quadrants.values()):
+            widget.setEnabled(not populating)
+
+    def _on_first_event_loop(self):
+        self.startup.mark("首次显示")
+        self._populate_step()
+
+    def _populate_step(self):
+        """启动时在事件循环中向一个象限填充一批任务，全部完成后进入启动收尾"""
+        if not self._pending_population:
+            self._finish_startup()
+            return
+        entry = self._pending_population.popleft()
+        name, tasks, done = entry
+        chunk = tasks[done:done + self.POPULATE_CHUNK]
+        model = self.quadrants[name].task_model
+        model.insert_tasks(len(model.tasks), chunk)
+        entry[2] = done + len(chunk)
+        if entry[2] < len(tasks):
+            self._pending_population.append(entry)
+        if self._pending_population:
+            QTimer.singleShot(0, self._populate_step)
+        else:
+            self._population_done()
+            QTimer.singleShot(0, self._finish_startup)
+
+    def finish_population(self):
+        """立即填充剩余任务（保存、归档、导出前调用，保证操作的是完整数据）"""
+        if not self._pending_population:
+            return
+        while self._pending_population:
+            name, tasks, done = self._pending_population.popleft()
+            model = self.quadrants[name].task_model
+            model.insert_tasks(len(model.tasks), tasks[done:])
+        self._population_done()
+
+    def _population_done(self):
+        self._set_populating(False)
+        if not self.search_index.built:
+            # 搜索索引在空闲时分批建立，第一次搜索时通常已经建好
+            self.search_index.start_build(
+                task for lw in self.quadrants.values() for task in lw.task_model.tasks
+            )
+            QTimer.singleShot(0, self._index_step)
+        # 填充期间输入的搜索只筛选了当时已有的任务
+        self.refresh_search()
+        if self.startup is not None:
+            self.startup.mark("填充任务")
+
+    def _index_step(self):
+        if not self.search_index.build_step(self.POPULATE_CHUNK):
+            QTimer.singleShot(0, self._index_step)
+
+    def _finish_startup(self):
+        """启动收尾：创建托盘、应用开机自启、执行一次归档，并输出启动耗时报告"""
+        if self.startup is None:
+            return
+        self.init_tray()
+        self.set_auto_start(self.auto_start_enabled)
+        self.maybe_archive()
+        self.update_api_server()
+        self.startup.mark("托盘 / 自启 / 归档 / 接口")
+        if "--startup-timing" in sys.argv and sys.stdout is not None:
+            print(self.startup.report())
+        self.startup = None
+
     def init_tray(self):
         """初始化托盘图标"""
         # 检查系统是否支持托盘
@@ -928,17 +2448,26 @@ class EisenhowerApp(QWidget):
 
     def quit_application(self):
         """退出应用程序"""
+        self.merge_external_changes(blocking=True)
         self.save_state()
-        self.tray_icon.hide()  # 隐藏托盘图标
+        if self.api_server is not None:
+            self.api_server.stop()
+        self.writer.stop()  # 等待后台线程把剩余内容写完
+        if getattr(self, "tray_icon", None) is not None:
+            self.tray_icon.hide()  # 隐藏托盘图标
         QApplication.quit()  # 退出应用
 
     def closeEvent(self, event):
         """重写关闭事件，隐藏窗口而不是退出"""
-        # 关闭前保存当前状态
+        # 关闭前合并其他进程的改动，再保存当前状态
+        self.merge_external_changes()
         self.save_state()
+        self.writer.flush()
         event.ignore()  # 忽略关闭事件
         self.hide()     # 隐藏窗口
-        # 显示通知
+        # 显示通知（托盘可能尚未创建或系统不支持）
+        if getattr(self, "tray_icon", None) is None:
+            return
         self.tray_icon.showMessage(
             "桌面任务挂件",
             "程序已最小化到系统托盘",
@@ -949,38 +2478,25 @@ class EisenhowerApp(QWidget):
     def toggle_lock(self):
         self._is_locked = self.lock_btn.isChecked()
         self.lock_btn.setText("🔒" if self._is_locked else "🔓")
-        # 锁定状态改变时也保存一次
-        self.save_state()
+        # 锁定状态改变时也记录一次
+        self.record_change({"op": "meta", "fields": {"is_locked": self._is_locked}}, undoable=False)
 
     def apply_font_settings(self):
         """根据当前字体大小设置，统一调整界面字体"""
-        # 标题
-        title_font = self.main_title.font()
-        title_font.setPointSize(self.title_font_size)
-        self.main_title.setFont(title_font)
-
-        # 事件名
-        event_font = self.event_name_input.font()
-        event_font.setPointSize(self.event_font_size)
-        self.event_name_input.setFont(event_font)
+        # 标题、事件名（字号未变时不重新设置）
+        Theme.set_point_size(self.main_title, self.title_font_size)
+        Theme.set_point_size(self.event_name_input, self.event_font_size)
 
         # 倒计时标签 - 使用样式表设置字体大小
         self.update_countdown_display()
 
         # 象限标题
         for label in self.quadrant_labels.values():
-            label.setStyleSheet(f"color: rgba(255,255,255,0.5); font-size: {self.quadrant_title_font_size}px; font-weight: bold;")
+            Theme.set_style(label, Theme.quadrant_title_style(self.quadrant_title_font_size))
 
-        # 各象限任务项
+        # 各象限任务项：字体设置在列表上，任务项绘制时统一使用
         for list_widget in getattr(self, "quadrants", {}).values():
-            for i in range(list_widget.count()):
-                item = list_widget.item(i)
-                if isinstance(item, TaskItem):
-                    font = item.font()
-                    font.setPointSize(self.task_font_size)
-                    item.setFont(font)
-                    # 重新应用一次外观（确保删除线/颜色仍然正确）
-                    item.update_appearance()
+            list_widget.set_task_font_size(self.task_font_size)
     
     # 设置框
     def open_settings_dialog(self):
@@ -1067,6 +2583,67 @@ class EisenhowerApp(QWidget):
         size_row.addWidget(height_spin)
         layout.addLayout(size_row)
 
+        # 自动保存间隔
+        interval_row = QHBoxLayout()
+        interval_label = QLabel("自动保存间隔（毫秒）：")
+        interval_spin = QSpinBox()
+        interval_spin.setRange(0, 10000)
+        interval_spin.setSingleStep(100)
+        interval_spin.setValue(self.save_interval_ms)
+        interval_row.addWidget(interval_label)
+        interval_row.addWidget(interval_spin)
+        layout.addLayout(interval_row)
+
+        # 撤销步数
+        undo_row = QHBoxLayout()
+        undo_label = QLabel("最多可撤销步数（0 为关闭）：")
+        undo_spin = QSpinBox()
+        undo_spin.setRange(0, 10000)
+        undo_spin.setValue(self.history.limit)
+        undo_row.addWidget(undo_label)
+        undo_row.addWidget(undo_spin)
+        layout.addLayout(undo_row)
+
+        # 归档策略
+        archive_days_row = QHBoxLayout()
+        archive_days_label = QLabel("已完成超过多少天后归档（0 为不归档）：")
+        archive_days_spin = QSpinBox()
+        archive_days_spin.setRange(0, 3650)
+        archive_days_spin.setValue(self.archive_after_days)
+        archive_days_row.addWidget(archive_days_label)
+        archive_days_row.addWidget(archive_days_spin)
+        layout.addLayout(archive_days_row)
+
+        archive_keep_row = QHBoxLayout()
+        archive_keep_label = QLabel("每个象限最多保留已完成任务（0 为不限）：")
+        archive_keep_spin = QSpinBox()
+        archive_keep_spin.setRange(0, 100000)
+        archive_keep_spin.setValue(self.archive_keep_done)
+        archive_keep_row.addWidget(archive_keep_label)
+        archive_keep_row.addWidget(archive_keep_spin)
+        layout.addLayout(archive_keep_row)
+
+        # 数据存储后端
+        storage_row = QHBoxLayout()
+        storage_label = QLabel("数据存储：")
+        storage_combo = QComboBox()
+        for key, label in STORAGE_BACKENDS.items():
+            storage_combo.addItem(label, key)
+        storage_combo.setCurrentIndex(storage_combo.findData(self.storage_backend))
+        storage_row.addWidget(storage_label)
+        storage_row.addWidget(storage_combo)
+        layout.addLayout(storage_row)
+
+        # 本地 HTTP 接口
+        api_row = QHBoxLayout()
+        api_label = QLabel("本地 HTTP 接口端口（0 为关闭）：")
+        api_spin = QSpinBox()
+        api_spin.setRange(0, 65535)
+        api_spin.setValue(self.api_port)
+        api_row.addWidget(api_label)
+        api_row.addWidget(api_spin)
+        layout.addLayout(api_row)
+
         # 确认/取消按钮
         btn_row = QHBoxLayout()
         ok_btn = QPushButton("确定")
@@ -1092,6 +2669,21 @@ class EisenhowerApp(QWidget):
             self.window_width = width_spin.value()
             self.window_height = height_spin.value()
             self.resize(self.window_width, self.window_height)
+            # 保存自动保存间隔
+            self.save_interval_ms = interval_spin.value()
+            self.writer.interval_ms = self.save_interval_ms
+            self.history.set_limit(undo_spin.value())
+            # 切换存储后端
+            if storage_combo.currentData() != self.storage_backend:
+                self.switch_storage(storage_combo.currentData())
+            # 归档策略修改后立即执行一次
+            self.archive_after_days = archive_days_spin.value()
+            self.archive_keep_done = archive_keep_spin.value()
+            self.archive_done_tasks()
+            # 启动 / 停止本地接口
+            self.api_port = api_spin.value()
+            if not self.update_api_server():
+                QMessageBox.warning(self, "本地接口", f"无法监听端口 {self.api_port}，接口未启动")
             # 应用到界面
             self.apply_font_settings()
             # 持久化到 JSON
@@ -1108,11 +2700,26 @@ class EisenhowerApp(QWidget):
             self.move(event.globalPosition().toPoint() - self._drag_pos)
             event.accept()
 
+    def mouseReleaseEvent(self, event):
+        if event.button() == Qt.MouseButton.LeftButton:
+            self.flush_position()  # 拖动结束
+        super().mouseReleaseEvent(event)
+
     def moveEvent(self, event):
-        """窗口移动时，实时保存位置"""
+        """窗口移动时只重新计时，停止移动后再保存位置"""
         super().moveEvent(event)
-        if hasattr(self, "settings"):
-            self.settings.setValue("pos", self.pos())
+        if hasattr(self, "_pos_timer"):
+            self._pos_timer.start()
+
+    def flush_position(self):
+        """位置有变化时写入 QSettings（每次拖动最多一次）"""
+        if not hasattr(self, "_pos_timer"):
+            return
+        self._pos_timer.stop()
+        pos = self.pos()
+        if pos != self._saved_pos:
+            self.settings.setValue("pos", pos)
+            self._saved_pos = pos
 
     def set_auto_start(self, enable=True):
         """开机自启逻辑 (Windows 注册表)"""
@@ -1126,7 +2733,12 @@ class EisenhowerApp(QWidget):
                 settings.remove("EisenhowerDesktopTask")
 
     def open_calendar_popup(self):
-        dialog = CalendarPopup(self, self.target_date)
+        # 日历弹窗只创建一次，之后复用（样式表不再重复解析）
+        dialog = getattr(self, "_calendar_popup", None)
+        if dialog is None:
+            dialog = self._calendar_popup = CalendarPopup(self, self.target_date)
+        else:
+            dialog.set_date(self.target_date)
         # 获取按钮在屏幕上的全局位置
         pos = self.date_btn.mapToGlobal(QPoint(0, self.date_btn.height()))
         dialog.move(pos.x() - 100, pos.y())
@@ -1134,92 +2746,465 @@ class EisenhowerApp(QWidget):
             self.target_date = dialog.selected_date
             self.date_btn.setText(f"{self.target_date.toString('yyyy-MM-dd')}")
             self.update_countdown_display()
-            self.save_state()
+            self.record_change({
+                "op": "meta",
+                "fields": {"target_date": self.target_date.toString("yyyy-MM-dd")},
+            }, undoable=False)
 
     def update_countdown_display(self):
         today = QDate.currentDate()
         days = today.daysTo(self.target_date)
-        self.cd_days_label.setText(f"{max(0, days)} 天")
-        self.cd_days_label.setStyleSheet(f"color: {'#ff7675' if days < 0 else 'white'}; font-size: {self.countdown_font_size}px; font-weight: bold;")  # 修改：使用变量
+        text = f"{max(0, days)} 天"
+        if self.cd_days_label.text() != text:
+            self.cd_days_label.setText(text)
+        # 只有过期状态或字号变化时样式才会改变
+        Theme.set_style(self.cd_days_label, Theme.countdown_style(self.countdown_font_size, days < 0))
 
     def add_task(self):
         text = self.task_input.text().strip()
         if text:
-            item = TaskItem(text)
-            self.quadrants["紧急重要"].addItem(item)
+            self.add_tasks([text])
             self.task_input.clear()
-            # 为新任务应用当前任务字体大小
-            font = item.font()
-            font.setPointSize(self.task_font_size)
-            item.setFont(font)
-            item.update_appearance()
-            self.save_state()
 
-    def on_item_clicked(self, item):
-        """处理项目点击事件"""
-        # print(f"Item clicked: {item.text()}, Type: {type(item)}")
-        
-        # 确保item是TaskItem类型
-        if isinstance(item, TaskItem):
-            item.toggle_status()
-            item.listWidget().clearSelection()
-            self.save_state()
+    def add_tasks(self, contents: list, quadrant: str = DEFAULT_QUADRANT) -> list:
+        """在象限末尾追加任务（空内容忽略），整批记录一次改动，返回新任务"""
+        tasks = [TaskItem(text.strip()) for text in contents if text.strip()]
+        if not tasks:
+            return []
+        self.finish_population()
+        model = self.quadrants[quadrant].task_model
+        row = len(model.tasks)
+        model.insert_tasks(row, tasks)
+        if len(tasks) == 1:
+            self.record_change({"op": "add", "q": quadrant, "row": row, "task": tasks[0].to_dict()})
         else:
-            # print(f"Warning: Clicked item is not TaskItem, it's {type(item)}")
-            # 如果不是TaskItem，尝试重新创建
-            list_widget = item.listWidget()
-            if list_widget:
-                row = list_widget.row(item)
-                if row >= 0:
-                    # 获取普通QListWidgetItem的文本
-                    content = item.text()
-                    
-                    # 移除旧的普通item
-                    old_item = list_widget.takeItem(row)
-                    del old_item
-                    
-                    # 创建新的TaskItem
-                    new_item = TaskItem(content)
-                    
-                    # 应用字体设置
-                    font = new_item.font()
-                    font.setPointSize(self.task_font_size)
-                    new_item.setFont(font)
-                    new_item.update_appearance()
-                    
-                    list_widget.insertItem(row, new_item)
-                    
-                    # print(f"Recreated TaskItem for: {content}")
-                    new_item.toggle_status()
-                    new_item.listWidget().clearSelection()
-                    self.save_state()
-
-    # 导出存在问题，只有标题导出了。。。。
-    # todo
+            self.record_change({
+                "op": "add_many",
+                "q": quadrant,
+                "row": row,
+                "tasks": [task.to_dict() for task in tasks],
+            })
+        self.refresh_search()
+        return tasks
+
+    def handle_command_line(self, argv: list, reply=None):
+        """
+        执行命令行参数中的命令（自己的启动参数，或其他实例转发来的），
+        完成后以 {"ok", "message"} 调用 reply。导出在后台线程进行，写完后才回复
+        """
+        reply = reply or (lambda result: None)
+        try:
+            args = parse_app_args(argv)
+        except SystemExit:
+            reply({"ok": False, "message": "无法识别的命令行参数"})
+            return
+        fmt = None
+        if args.export:
+            fmt = os.path.splitext(args.export)[1].lstrip(".").lower()
+            if fmt not in EXPORT_FORMATS:
+                reply({"ok": False, "message": "无法从扩展名判断导出格式（支持 csv / json / ndjson）"})
+                return
+        messages = []
+        if args.add:
+            tasks = self.add_tasks(args.add, args.quadrant)
+            messages.append(f"已添加 {len(tasks)} 条任务到“{args.quadrant}”")
+        if args.show or not (args.add or args.export):
+            # 再次启动程序（不带命令）时显示已运行的窗口
+            self.show_normal()
+        if not args.export:
+            reply({"ok": True, "message": "\n".join(messages)})
+            return
+
+        self.finish_population()
+        sources = [(q, tuple(lw.task_model.tasks)) for q, lw in self.quadrants.items()]
+        worker = ExportWorker(args.export, fmt, sources, ExportFilter(), parent=self)
+
+        def on_finished(written):
+            messages.append(f"已导出 {written} 条任务到 {args.export}")
+            reply({"ok": True, "message": "\n".join(messages)})
+
+        def on_failed(message):
+            reply({"ok": False, "message": "\n".join(messages + [f"导出失败：{message}"])})
+
+        worker.finished_export.connect(on_finished)
+        worker.failed.connect(on_failed)
+        # 保持引用，避免线程运行中被回收
+        self._command_exports.add(worker)
+        worker.finished.connect(lambda: self._command_exports.discard(worker))
+        worker.finished.connect(worker.deleteLater)
+        worker.start()
+
+    def record_toggle(self, list_widget: QuadrantList, row: int, old: dict):
+        """记录一次完成状态切换（old 为切换前的字段，用于撤销）"""
+        task = list_widget.task(row)
+        self.record_change({
+            "op": "update",
+            "q": list_widget.quadrant_name,
+            "row": row,
+            "id": task.id,
+            "fields": {"is_done": task.is_done, "finished_at": task.finished_at},
+            "old": old,
+        })
+
+    def on_task_clicked(self, list_widget: QuadrantList, view_row: int):
+        """处理任务点击事件：切换完成状态"""
+        if not 0 <= view_row < list_widget.task_model.rowCount():
+            return
+        # 按住 Ctrl / Shift 点击只用于多选，不切换状态
+        modifiers = QApplication.keyboardModifiers()
+        if modifiers & (Qt.KeyboardModifier.ControlModifier | Qt.KeyboardModifier.ShiftModifier):
+            return
+        row = list_widget.task_model.store_row(view_row)
+        task = list_widget.task(row)
+        old = {"is_done": task.is_done, "finished_at": task.finished_at}
+        task.toggle_status()
+        list_widget.task_model.task_changed(row)
+        list_widget.clearSelection()
+        self.record_toggle(list_widget, row, old)
+
     def export_tasks(self):
-        path, _ = QFileDialog.getSaveFileName(self, "导出任务", "已完成事项.csv", "CSV (*.csv)")
+        """按选定的格式和筛选条件在后台线程导出任务，可查看进度并取消"""
+        self.finish_population()
+        dlg = ExportDialog(list(self.quadrants), self)
+        if not dlg.exec():
+            return
+        fmt = dlg.selected_format()
+        export_filter = dlg.export_filter()
+        label, pattern = EXPORT_FORMATS[fmt]
+        default_name = "已完成事项" if export_filter.done else "任务导出"
+        path, _ = QFileDialog.getSaveFileName(
+            self, "导出任务", f"{default_name}.{fmt}", f"{label} ({pattern})"
+        )
+        if not path: return
+
+        # 只取各象限任务对象的引用，导出过程中界面仍可正常操作
+        sources = [(q, tuple(lw.task_model.tasks)) for q, lw in self.quadrants.items()]
+        total = sum(len(tasks) for _, tasks in sources)
+        archive = None
+        if dlg.include_archive():
+            # 等待尚未写出的归档落盘后再读取
+            self.writer.flush()
+            archive = self.archive
+            total += archive.count()
+
+        progress = QProgressDialog("正在导出...", "取消", 0, max(total, 1), self)
+        progress.setWindowTitle("导出任务")
+        progress.setWindowModality(Qt.WindowModality.WindowModal)
+        progress.setMinimumDuration(300)  # 很快完成时不弹出进度框
+
+        worker = ExportWorker(path, fmt, sources, export_filter, archive, self)
+        worker.progress.connect(progress.setValue)
+        progress.canceled.connect(worker.cancel)
+
+        def on_finished(written):
+            progress.close()
+            if written is None:
+                QMessageBox.information(self, "已取消", "导出已取消")
+            else:
+                QMessageBox.information(self, "完成", f"数据已成功导出（共 {written} 条）")
+
+        def on_failed(message):
+            progress.close()
+            QMessageBox.warning(self, "导出失败", message)
+
+        worker.finished_export.connect(on_finished)
+        worker.failed.connect(on_failed)
+        worker.finished.connect(worker.deleteLater)
+        self.export_worker = worker  # 保持引用，避免线程运行中被回收
+        worker.start()
+
+
+    def import_tasks(self):
+        """从 CSV / NDJSON 文件批量导入任务（导出的逆操作），在后台解析、分批插入"""
+        path, _ = QFileDialog.getOpenFileName(
+            self, "导入任务", "", "任务文件 (*.csv *.ndjson *.jsonl);;CSV (*.csv);;NDJSON (*.ndjson *.jsonl)"
+        )
         if not path: return
-        data = []
+
+        progress = QProgressDialog("正在导入...", "取消", 0, 100, self)
+        progress.setWindowTitle("导入任务")
+        progress.setWindowModality(Qt.WindowModality.WindowModal)
+        progress.setMinimumDuration(300)
+
+        worker = ImportWorker(path, list(self.quadrants), DEFAULT_QUADRANT, parent=self)
+        worker.batch_ready.connect(self.insert_task_batch)
+        worker.progress.connect(progress.setValue)
+        progress.canceled.connect(worker.cancel)
+
+        def on_finished(imported, errors):
+            progress.close()
+            # 导入量可能很大，结束后直接压缩一次快照
+            self.save_state()
+            message = "导入已取消" if imported is None else f"成功导入 {imported} 条任务"
+            if errors:
+                message += "\n\n以下行被跳过：\n" + "\n".join(errors)
+            QMessageBox.information(self, "导入", message)
+
+        worker.finished_import.connect(on_finished)
+        worker.finished.connect(worker.deleteLater)
+        self.import_worker = worker  # 保持引用，避免线程运行中被回收
+        worker.start()
+
+    def insert_task_batch(self, batch: list):
+        """整批插入任务：每个象限一次行插入通知，整批只记录一次改动"""
+        grouped = {}
+        for t in batch:
+            grouped.setdefault(t["quadrant"], []).append(t)
+        records = []
+        for q_name, items in grouped.items():
+            model = self.quadrants[q_name].task_model
+            # 追加到存储末尾（搜索筛选时 rowCount() 只是可见行数）
+            row = len(model.tasks)
+            tasks = [
+                TaskItem(
+                    t["content"],
+                    created_at=t["created_at"],
+                    finished_at=t["finished_at"],
+                    is_done=t["is_done"],
+                )
+                for t in items
+            ]
+            model.insert_tasks(row, tasks)
+            records.append({
+                "op": "add_many",
+                "q": q_name,
+                "row": row,
+                "tasks": [task.to_dict() for task in tasks],
+            })
+        if records:
+            # 导入只在末尾追加，不进入撤销栈，也不影响已有记录的行号
+            self.record_change({"op": "batch", "records": records}, undoable=False)
+            self.refresh_search()
+
+    def update_api_server(self) -> bool:
+        """按设置启动、重启或停止本地 HTTP 接口，返回接口状态是否与设置一致"""
+        running_port = self.api_server.port if self.api_server is not None else 0
+        if running_port == self.api_port:
+            return True
+        if self.api_server is not None:
+            self.api_server.stop()
+            self.api_server.deleteLater()
+            self.api_server = None
+        if not self.api_port:
+            return True
+        server = TaskApiServer(self.handle_api_requests, self)
+        try:
+            server.start(self.api_port)
+        except OSError:
+            server.deleteLater()
+            return False
+        self.api_server = server
+        return True
+
+    def handle_api_requests(self, requests: list):
+        """整批执行接口请求：期间暂停重绘，所有改动合并为一次提交（可整体撤销）"""
+        self.finish_population()
+        records = []
+        for list_widget in self.quadrants.values():
+            list_widget.setUpdatesEnabled(False)
+        try:
+            for request in requests:
+                try:
+                    request.status, request.result = self._execute_api_request(request, records)
+                except ApiError as e:
+                    request.status, request.result = e.status, {"error": e.message}
+        finally:
+            for list_widget in self.quadrants.values():
+                list_widget.setUpdatesEnabled(True)
+        if records:
+            self.record_change(records[0] if len(records) == 1 else {"op": "batch", "records": records})
+            self.refresh_search()
+
+    def _api_locate(self, task_id: str) -> tuple:
+        location = self.task_index.locate(task_id)
+        if location is None:
+            raise ApiError(404, f"任务不存在：{task_id}")
+        return location
+
+    def _api_quadrant(self, name) -> str:
+        if name not in self.quadrants:
+            raise ApiError(400, f"未知的象限：{name}")
+        return name
+
+    def _api_task(self, q_name: str, row: int) -> dict:
+        task = self.quadrants[q_name].task_model.task(row)
+        return dict(task.to_dict(), quadrant=q_name, row=row)
+
+    def _execute_api_request(self, request: ApiRequest, records: list) -> tuple:
+        """执行一个接口请求，改动记录追加到 records，返回 (HTTP 状态码, 结果)"""
+        body = request.body if isinstance(request.body, dict) else {}
+        if request.action == "list":
+            names = list(self.quadrants)
+            if "quadrant" in request.query:
+                names = [self._api_quadrant(request.query["quadrant"])]
+            return 200, {
+                "quadrants": {
+                    name: [
+                        dict(task.to_dict(), row=row)
+                        for row, task in enumerate(self.quadrants[name].task_model.tasks)
+                    ]
+                    for name in names
+                }
+            }
+
+        if request.action == "add":
+            # 单个任务 {"content", "quadrant"}，或批量 {"tasks": [...]} / [...]
+            if isinstance(request.body, list):
+                items = request.body
+            else:
+                items = body.get("tasks") if "tasks" in body else [body]
+            if not isinstance(items, list) or not all(isinstance(item, dict) for item in items):
+                raise ApiError(400, "请求体应为 {\"content\": ...}、{\"tasks\": [...]} 或任务数组")
+            new = []
+            for item in items:
+                content = str(item.get("content") or "").strip()
+                if not content:
+                    raise ApiError(400, "任务内容不能为空")
+                new.append((self._api_quadrant(item.get("quadrant", DEFAULT_QUADRANT)), TaskItem(content)))
+            added = []
+            for q_name, task in new:
+                record = {
+                    "op": "add",
+                    "q": q_name,
+                    "row": len(self.quadrants[q_name].task_model.tasks),
+                    "task": task.to_dict(),
+                }
+                self.apply_record(record)
+                records.append(record)
+                added.append(self._api_task(q_name, record["row"]))
+            return 201, {"tasks": added}
+
+        q_name, row = self._api_locate(request.task_id)
+        task = self.quadrants[q_name].task_model.task(row)
+        if request.action == "toggle":
+            is_done = not task.is_done
+            record = {
+                "op": "update",
+                "q": q_name,
+                "row": row,
+                "id": task.id,
+                "fields": {
+                    "is_done": is_done,
+                    "finished_at": datetime.now().strftime("%Y-%m-%d %H:%M") if is_done else "未完成",
+                },
+                "old": {"is_done": task.is_done, "finished_at": task.finished_at},
+            }
+            self.apply_record(record)
+            records.append(record)
+            return 200, {"task": self._api_task(q_name, row)}
+
+        if request.action == "move":
+            to_q = self._api_quadrant(body.get("quadrant", q_name))
+            # 默认移到目标象限末尾；行号超出范围时夹到两端
+            last = len(self.quadrants[to_q].task_model.tasks) - (1 if to_q == q_name else 0)
+            to_row = body.get("row", last)
+            if not isinstance(to_row, int):
+                raise ApiError(400, "row 必须是整数")
+            to_row = max(0, min(to_row, last))
+            record = {"op": "move", "q": q_name, "row": row, "id": task.id, "to_q": to_q, "to_row": to_row}
+            self.apply_record(record)
+            records.append(record)
+            return 200, {"task": self._api_task(to_q, to_row)}
+
+        # delete
+        record = {"op": "delete", "q": q_name, "row": row, "id": task.id, "task": task.to_dict()}
+        self.apply_record(record)
+        records.append(record)
+        return 200, {"task": dict(record["task"], quadrant=q_name)}
+
+    def maybe_archive(self):
+        """每天执行一次归档（启动后和日期变化时）"""
+        today = QDate.currentDate()
+        if self._last_archive_date != today:
+            self._last_archive_date = today
+            self.archive_done_tasks()
+
+    def archive_done_tasks(self) -> int:
+        """按归档策略把已完成任务移出看板并追加到归档文件，返回归档条数"""
+        if not (self.archive_after_days or self.archive_keep_done):
+            return 0
+        self.finish_population()
+        cutoff = archive_cutoff(self.archive_after_days)
+        archived_at = datetime.now().strftime("%Y-%m-%d %H:%M")
+        entries = []
+        records = []
         for q_name, list_widget in self.quadrants.items():
-            for i in range(list_widget.count()):
-                item = list_widget.item(i)
-                if isinstance(item, TaskItem) and item.is_done:
-                    data.append([item.content, q_name, item.created_at, item.finished_at])
-        with open(path, 'w', newline='', encoding='utf-8-sig') as f:
-            writer = csv.writer(f)
-            writer.writerow(["内容", "象限", "创建时间", "完成时间"])
-            writer.writerows(data)
-        QMessageBox.information(self, "完成", "数据已成功导出")
+            rows = select_tasks_to_archive(list_widget.task_model.tasks, cutoff, self.archive_keep_done)
+            if not rows:
+                continue
+            removed = list_widget.task_model.remove_tasks(rows)
+            entries.extend(dict(t.to_dict(), quadrant=q_name, archived_at=archived_at) for t in removed)
+            # 从后往前删除，前面的行号不受影响
+            records.extend(
+                {"op": "delete", "q": q_name, "row": row, "id": task.id}
+                for row, task in reversed(list(zip(sorted(rows), removed)))
+            )
+        if entries:
+            self.writer.submit_archive(entries)
+            self.record_change({"op": "batch", "records": records}, undoable=False)
+            # 归档删除了行，撤销栈中的行号不再可靠
+            self.history.clear()
+        return len(entries)
+
+    def apply_search(self, query: str):
+        """按查询语句筛选四个象限：关键字匹配内容，也可以加 quadrant: / done: / created> 等条件"""
+        try:
+            parsed = TaskQuery.parse(query)
+        except QueryError as e:
+            # 多半是还没输入完，保留当前的筛选结果
+            self._set_search_state(Theme.INPUT_ERROR_STYLE, str(e))
+            return
+        self._set_search_state(Theme.INPUT_STYLE, QUERY_HELP)
+        if not self.search_index.ready and not parsed.is_empty():
+            # 空闲时的分批建索引还没完成（或启动填充尚未结束）：把剩余部分一次建完
+            if not self.search_index.built:
+                self.search_index.start_build(
+                    task for lw in self.quadrants.values() for task in lw.task_model.tasks
+                )
+            self.search_index.finish_build()
+        matches = self.search_index.select(parsed)
+        if matches is not None and not isinstance(matches, set):
+            # 各象限要按集合判断任务是否命中，结果为列表时只在这里转换一次
+            matches = set(matches)
+        for name, list_widget in self.quadrants.items():
+            if parsed.quadrants is not None and name not in parsed.quadrants:
+                list_widget.task_model.set_filter(())
+            else:
+                list_widget.task_model.set_filter(matches)
+
+    def _set_search_state(self, style: str, tooltip: str):
+        """搜索框的边框和提示；每次按键都会调用，没有变化时不重新设置"""
+        Theme.set_style(self.search_input, style)
+        if self.search_input.toolTip() != tooltip:
+            self.search_input.setToolTip(tooltip)
+
+    def refresh_search(self):
+        """任务增加后重新执行当前搜索，让新任务按关键字显示或隐藏"""
+        if self.search_input.text().strip():
+            self.apply_search(self.search_input.text())
 
 
 if __name__ == "__main__":
+    # 已运行的实例在文件开头就已转发并退出，走到这里说明没有运行中的实例
+    args = parse_app_args(sys.argv[1:])
+    server_name = instance_server_name(app_data_file())
+
     app = QApplication(sys.argv)
     app.setQuitOnLastWindowClosed(False)  # 关闭窗口时不退出程序（在托盘运行）
     app.setFont(QFont("Microsoft YaHei UI", 10))
     
     # 确保只有一个实例运行
     app.setApplicationName("EisenhowerDesktopTask")
+
+    # 创建界面之前先占用实例名称；同时启动的另一个实例已抢先占用时，把命令行转发给它
+    server = InstanceServer(server_name)
+    if not server.start():
+        exit_with_reply(forward_to_running_instance(server_name, sys.argv[1:]))
     
     window = EisenhowerApp()
     window.show()
+    # 其他实例转发来的命令由本实例执行；启动参数中的命令在界面创建后执行一次
+    server.set_handler(window.handle_command_line)
+    if args.add or args.export:
+        window.handle_command_line(sys.argv[1:])
     sys.exit(app.exec())
\ No newline at end of file